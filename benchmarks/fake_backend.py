@@ -0,0 +1,203 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlparse, parse_qs
+from services.window_codec import decode_windows
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 1024 # The default of 5 drops connections under fleet-sized bursts
+
+class FakeBackendConfig:
+    """Shape and behaviour of the stand-in backend."""
+    def __init__(self, n_projects: int = 30, m_tasks: int = 200, assigned_fraction: float = 0.25,
+                 latency_ms: float = 20.0, jitter_ms: float = 5.0, error_rate: float = 0.0,
+                 bulk_tasks: bool = False, bulk_windows: bool = True, change_feeds: bool = True,
+                 bulk_task_times: bool = True, seed: int = 1):
+        self.n_projects = n_projects
+        self.m_tasks = m_tasks
+        self.assigned_fraction = assigned_fraction
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.bulk_tasks = bulk_tasks # Whether GET /v1/task/bulk exists
+        self.bulk_windows = bulk_windows # Whether POST /v1/time-entries/bulk exists
+        self.change_feeds = change_feeds # Whether GET /v1/project/changes and /v1/task/changes exist
+        self.bulk_task_times = bulk_task_times # Whether GET /v1/analytics/task-time/bulk exists
+        self.seed = seed
+
+class FakeBackend:
+    """
+    A local stand-in for the T3 backend, serving the routes the desktop client uses
+    (/api/auth, /v1/project, /v1/task, /v1/time-entries, /v1/hosts, /v1/analytics)
+    from generated data, with configurable latency, jitter and error rate.
+    """
+    USER_ID = "user-0"
+    TOKEN = "fake-token"
+
+    def __init__(self, config: Optional[FakeBackendConfig] = None, port: int = 0):
+        self.config = config or FakeBackendConfig()
+        self.version = 1 # Bumped on every change; the changes feeds use it as their cursor
+        self._generate()
+        self.windows_received = 0
+        self.task_times: Dict[str, int] = {} # Total ms received per task, on top of a generated starting total
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self.server = _Server(("127.0.0.1", port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-backend", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self) -> "FakeBackend":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _generate(self):
+        rng = random.Random(self.config.seed)
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        self.versions: Dict[str, int] = {} # Version each project and task was last changed at
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.tasks_by_project: Dict[str, List[Dict[str, Any]]] = {}
+        for p in range(self.config.n_projects):
+            project_id = f"project-{p}"
+            self.projects[project_id] = {"id": project_id, "name": f"Project {p}", "description": "Generated project"}
+            self.versions[project_id] = self.version
+            summaries = []
+            for t in range(self.config.m_tasks):
+                task_id = f"{project_id}-task-{t}"
+                employees = [f"user-{rng.randint(1, 50)}"]
+                if rng.random() < self.config.assigned_fraction:
+                    employees.append(self.USER_ID)
+                task = {"id": task_id, "name": f"Task {t} of project {p}", "projectId": project_id,
+                        "employees": employees, "description": "Generated task " * 4}
+                self.tasks[task_id] = task
+                summaries.append({"id": task_id, "name": task["name"], "employees": employees})
+                self.versions[task_id] = self.version
+            self.tasks_by_project[project_id] = summaries
+        self.user = {"id": self.USER_ID, "name": "Bench User", "email": "bench@example.com",
+                     "projects": list(self.projects)}
+
+    def rename_task(self, task_id: str, name: str):
+        """Changes a task, as another user editing it would; the change shows up in the task changes feed."""
+        with self._lock:
+            self.version += 1
+            self.versions[task_id] = self.version
+            task = self.tasks[task_id]
+            task["name"] = name
+            summaries = self.tasks_by_project[task["projectId"]]
+            for i, summary in enumerate(summaries):
+                if summary["id"] == task_id:
+                    summaries[i] = dict(summary, name=name)
+
+    def _task_time(self, task_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return {"taskId": task_id, "totalTimeMillis": 3_600_000 + self.task_times.get(task_id, 0)}
+
+    def _record_windows(self, windows: List[Dict[str, Any]]):
+        with self._lock:
+            self.windows_received += len(windows)
+            for window in windows:
+                task_id = window.get("taskId")
+                self.task_times[task_id] = self.task_times.get(task_id, 0) + window.get("end", 0) - window.get("start", 0)
+
+    def _changes(self, items: List[Dict[str, Any]], since: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            cursor = self.version
+            if not since or not since.isdigit() or int(since) > cursor:
+                return {"cursor": str(cursor), "full": True, "items": items, "deleted": []}
+            changed = [item for item in items if self.versions[item["id"]] > int(since)]
+            return {"cursor": str(cursor), "full": False, "items": changed, "deleted": []}
+
+    def _make_handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real backend
+            disable_nagle_algorithm = True # Headers and body are written separately; don't let the body wait for an ACK
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                backend._handle(self, "GET")
+
+            def do_POST(self):
+                backend._handle(self, "POST")
+
+        return Handler
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str):
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        with self._lock:
+            self.requests_served += 1
+            delay = max(0.0, self._random.gauss(self.config.latency_ms, self.config.jitter_ms)) / 1000
+            fail = self._random.random() < self.config.error_rate
+        time.sleep(delay)
+        if fail:
+            return self._reply(handler, 503, {"detail": "Injected failure"})
+
+        url = urlparse(handler.path)
+        path = url.path[len("/api"):] if url.path.startswith("/api") else url.path
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in path.split("/") if part]
+
+        if method == "POST" and path == "/auth/login":
+            return self._reply(handler, 200, {"access_token": self.TOKEN, "token_type": "bearer"})
+        if handler.headers.get("Authorization") != f"Bearer {self.TOKEN}":
+            return self._reply(handler, 401, {"detail": "Not authenticated"})
+
+        if method == "GET" and path == "/auth/me":
+            return self._reply(handler, 200, self.user)
+        if method == "GET" and path == "/v1/project/changes" and self.config.change_feeds:
+            visible = [self.projects[pid] for pid in self.user["projects"]]
+            return self._reply(handler, 200, self._changes(visible, query.get("since")))
+        if method == "GET" and path == "/v1/task/changes" and self.config.change_feeds:
+            tasks = self.tasks_by_project.get(query.get("projectId"), [])
+            return self._reply(handler, 200, self._changes(tasks, query.get("since")))
+        if method == "GET" and parts[:2] == ["v1", "project"] and len(parts) == 3:
+            project = self.projects.get(parts[2])
+            return self._reply(handler, 200 if project else 404, project or {"detail": "Not found"})
+        if method == "GET" and path == "/v1/task":
+            return self._reply(handler, 200, self.tasks_by_project.get(query.get("projectId"), []))
+        if method == "GET" and path == "/v1/task/bulk" and self.config.bulk_tasks:
+            ids = query.get("ids", "").split(",")
+            return self._reply(handler, 200, [self.tasks[task_id] for task_id in ids if task_id in self.tasks])
+        if method == "GET" and parts[:2] == ["v1", "task"] and len(parts) == 3:
+            task = self.tasks.get(parts[2])
+            return self._reply(handler, 200 if task else 404, task or {"detail": "Not found"})
+        if method == "GET" and path == "/v1/analytics/task-time":
+            return self._reply(handler, 200, self._task_time(query.get("taskId")))
+        if method == "GET" and path == "/v1/analytics/task-time/bulk" and self.config.bulk_task_times:
+            ids = [task_id for task_id in query.get("taskIds", "").split(",") if task_id]
+            return self._reply(handler, 200, [self._task_time(task_id) for task_id in ids])
+        if method == "POST" and path == "/v1/time-entries":
+            self._record_windows([json.loads(body or b"{}")])
+            return self._reply(handler, 201, {"status": "ok"})
+        if method == "POST" and path == "/v1/time-entries/bulk" and self.config.bulk_windows:
+            windows = decode_windows(body, handler.headers.get("Content-Encoding", "gzip"))
+            self._record_windows(windows)
+            return self._reply(handler, 201, {"accepted": len(windows)})
+        if method == "POST" and path == "/v1/hosts":
+            return self._reply(handler, 201, {"status": "ok"})
+        return self._reply(handler, 404, {"detail": "Not found"})
+
+    @staticmethod
+    def _reply(handler: BaseHTTPRequestHandler, status: int, payload: Any):
+        body = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
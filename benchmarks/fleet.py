@@ -0,0 +1,227 @@
+"""
+Fleet load simulator: thousands of virtual tracker clients in one process.
+
+    python -m benchmarks.fleet                                   # 200 employees against a local stand-in backend
+    python -m benchmarks.fleet --employees 2000 --arrival-rate 100 --windows 5 --window-seconds 10
+    python -m benchmarks.fleet --base-url http://staging:8000/api --email-pattern load{n}@example.com
+
+Each virtual employee does what the desktop client does: logs in, loads its
+user, projects, tasks and task totals, then tracks time on one of its tasks
+and posts a time window every `--window-seconds`, using the same request
+shapes as APIClient and the window format from services/tracking_engine.py.
+Employees arrive as a Poisson process, and their windows are jittered so they
+do not all hit the backend in lockstep.
+
+Reports the achieved request rate, latency percentiles per route and a
+breakdown of errors by route and status (or exception type).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_backend import FakeBackend, FakeBackendConfig
+from benchmarks.run import percentile
+from services.api_client import route_of
+from services.system_info import get_host_fingerprint
+from services.tracking_engine import build_window
+
+class FleetStats:
+    """Latency samples per route and error counts, shared by every virtual employee (one event loop, no locking)."""
+    def __init__(self):
+        self.latencies_ms: Dict[str, List[float]] = {}
+        self.errors: Counter = Counter()
+        self.requests = 0
+        self.windows_sent = 0
+        self.employees_started = 0
+        self.employees_failed = 0
+
+    def record(self, route: str, elapsed_ms: float, error: Optional[str] = None):
+        self.requests += 1
+        self.latencies_ms.setdefault(route, []).append(elapsed_ms)
+        if error:
+            self.errors[f"{route} {error}"] += 1
+
+    def report(self, elapsed_s: float) -> Dict[str, Any]:
+        routes = {
+            route: {
+                "n": len(samples),
+                "p50_ms": round(percentile(samples, 0.50), 2),
+                "p90_ms": round(percentile(samples, 0.90), 2),
+                "p99_ms": round(percentile(samples, 0.99), 2),
+            } for route, samples in sorted(self.latencies_ms.items())
+        }
+        return {
+            "elapsed_s": round(elapsed_s, 2),
+            "requests": self.requests,
+            "requests_per_s": round(self.requests / elapsed_s, 1) if elapsed_s else 0.0,
+            "windows_sent": self.windows_sent,
+            "employees_started": self.employees_started,
+            "employees_failed": self.employees_failed,
+            "routes": routes,
+            "errors": dict(self.errors.most_common()),
+        }
+
+class VirtualEmployee:
+    """One simulated tracker client; run() goes from login to its last window."""
+    def __init__(self, n: int, base_url: str, stats: FleetStats, args: argparse.Namespace, rng: random.Random):
+        self.email = args.email_pattern.format(n=n)
+        self.base_url = base_url
+        self.client: Optional[httpx.AsyncClient] = None
+        self.stats = stats
+        self.args = args
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+
+    async def request(self, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        """Sends one request and records it. Returns the response if it succeeded, else None."""
+        route = f"{method} {route_of(path)}"
+        started = time.perf_counter()
+        try:
+            res = await self.client.request(method, path, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(route, (time.perf_counter() - started) * 1000, type(e).__name__)
+            return None
+        self.stats.record(route, (time.perf_counter() - started) * 1000,
+                          None if res.is_success else str(res.status_code))
+        return res if res.is_success else None
+
+    async def run(self):
+        self.stats.employees_started += 1
+        # Each employee has its own small connection pool, like a real client (and unlike one shared pool,
+        # whose request scheduling slows down with every connection and queued request it holds)
+        limits = httpx.Limits(max_connections=self.args.connections, max_keepalive_connections=self.args.connections)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=self.args.timeout) as self.client:
+            if not await self.start_session():
+                self.stats.employees_failed += 1
+
+    async def start_session(self) -> bool:
+        res = await self.request("POST", "/auth/login", data={"username": self.email, "password": self.args.password})
+        if res is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {res.json().get('access_token')}"}
+
+        res = await self.request("GET", "/auth/me")
+        if res is None:
+            return False
+        user = res.json()
+        project_ids = user.get("projects") or []
+        if not project_ids:
+            return False
+        # Like the client, all project details are loaded concurrently, then one project's tasks
+        await asyncio.gather(*(self.request("GET", f"/v1/project/{pid}") for pid in project_ids))
+        project_id = self.rng.choice(project_ids)
+        res = await self.request("GET", "/v1/task", params={"projectId": project_id})
+        if res is None:
+            return False
+        assigned = [task["id"] for task in res.json() if user.get("id") in task.get("employees", [])]
+        if not assigned:
+            return True # Nothing this employee may track
+        await self.load_task_totals(user["id"], assigned)
+        await self.track(project_id, self.rng.choice(assigned))
+        return True
+
+    async def load_task_totals(self, user_id: str, task_ids: List[str]):
+        res = await self.request("GET", "/v1/analytics/task-time/bulk",
+                                 params={"employeeId": user_id, "taskIds": ",".join(task_ids)})
+        if res is None and not self.args.no_fallback:
+            await asyncio.gather(*(
+                self.request("GET", "/v1/analytics/task-time", params={"employeeId": user_id, "taskId": task_id})
+                for task_id in task_ids
+            ))
+
+    async def track(self, project_id: str, task_id: str):
+        if self.args.host_reference:
+            host_ref, host_info = get_host_fingerprint()
+            await self.request("POST", "/v1/hosts", json={"hostRef": host_ref, **host_info})
+        window_ms = int(self.args.window_seconds * 1000)
+        start = int(time.time() * 1000)
+        for _ in range(self.args.windows):
+            # Jittered so windows of employees that started together drift apart, as real clients do
+            await asyncio.sleep(self.args.window_seconds * self.rng.uniform(1 - self.args.jitter, 1 + self.args.jitter))
+            end = start + window_ms
+            window_data = build_window(project_id, task_id, start, end, host_reference=self.args.host_reference)
+            if await self.request("POST", "/v1/time-entries", json=window_data.to_json()) is not None:
+                self.stats.windows_sent += 1
+            start = end
+
+async def run_fleet(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Starts `args.employees` virtual employees at `args.arrival_rate` per second and waits for all of them."""
+    rng = random.Random(args.seed)
+    stats = FleetStats()
+    started = time.perf_counter()
+    employees = []
+    for n in range(args.employees):
+        employees.append(asyncio.create_task(VirtualEmployee(n, base_url, stats, args, random.Random(rng.random())).run()))
+        if args.arrival_rate > 0:
+            await asyncio.sleep(rng.expovariate(args.arrival_rate)) # Poisson arrivals
+    await asyncio.gather(*employees)
+    return stats.report(time.perf_counter() - started)
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{report['employees_started']} employees ({report['employees_failed']} failed), "
+          f"{report['windows_sent']} windows, {report['requests']} requests in {report['elapsed_s']}s "
+          f"= {report['requests_per_s']} requests/s")
+    print(f"\n{'route':<44}{'n':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for route, summary in report["routes"].items():
+        print(f"{route:<44}{summary['n']:>8}{summary['p50_ms']:>10}{summary['p90_ms']:>10}{summary['p99_ms']:>10}")
+    if report["errors"]:
+        print("\nErrors:")
+        for key, count in report["errors"].items():
+            print(f"  {key}: {count}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a fleet of tracker clients against a backend.")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--arrival-rate", type=float, default=50.0, help="employees starting per second (Poisson); 0 starts all at once")
+    parser.add_argument("--windows", type=int, default=3, help="windows each employee posts")
+    parser.add_argument("--window-seconds", type=float, default=5.0)
+    parser.add_argument("--jitter", type=float, default=0.1, help="window interval jitter, as a fraction")
+    parser.add_argument("--host-reference", action="store_true", help="send host fingerprint references instead of inline host info")
+    parser.add_argument("--no-fallback", action="store_true", help="don't fall back to per-task totals without the bulk endpoint")
+    parser.add_argument("--connections", type=int, default=4, help="connection pool size of each employee")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", help="target this backend instead of a local stand-in")
+    parser.add_argument("--email-pattern", default="fleet{n}@example.com")
+    parser.add_argument("--password", default="secret")
+    parser.add_argument("--projects", type=int, default=5, help="stand-in backend: projects")
+    parser.add_argument("--tasks", type=int, default=50, help="stand-in backend: tasks per project")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stand-in backend: latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="stand-in backend: latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="stand-in backend: injected 503 rate")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+
+    backend = None
+    base_url = args.base_url
+    if not base_url:
+        backend = FakeBackend(FakeBackendConfig(
+            n_projects=args.projects, m_tasks=args.tasks, latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms, error_rate=args.error_rate
+        )).start()
+        base_url = backend.base_url
+    print(f"Simulating {args.employees} employees against {base_url}...")
+    try:
+        report = asyncio.run(run_fleet(base_url, args))
+    finally:
+        if backend:
+            backend.stop()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"parameters": vars(args), "results": report}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
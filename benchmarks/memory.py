@@ -0,0 +1,104 @@
+"""
+Memory benchmark: what the client's projects, tasks and time windows cost to keep in memory.
+
+    python -m benchmarks.memory                         # 100 projects, 10,000 tasks, 10,000 windows
+    python -m benchmarks.memory --projects 50 --tasks 50000 --json memory.json
+
+Builds the same data the stand-in backend serves and measures, with tracemalloc,
+the bytes held per item when the decoded JSON is kept as dicts and when it is
+kept as the compact records of services/records.py (interning and shared
+values included).
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_backend import FakeBackend, FakeBackendConfig
+from services.records import Project, Task
+from services.tracking_engine import build_window
+
+def held_bytes(build: Callable[[], Any]) -> int:
+    """Bytes still allocated after `build()` returns, i.e. what keeping its result costs."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return size
+
+def compare(payloads: List[str], record) -> Dict[str, float]:
+    """Dicts versus records for JSON arrays decoded one response at a time, as the client receives them."""
+    n = sum(len(json.loads(payload)) for payload in payloads)
+    as_dicts = held_bytes(lambda: [json.loads(payload) for payload in payloads])
+    as_records = held_bytes(lambda: [[record.from_json(item) for item in json.loads(payload)] for payload in payloads])
+    return summarize(n, as_dicts, as_records)
+
+def summarize(n: int, as_dicts: int, as_records: int) -> Dict[str, float]:
+    return {
+        "n": n,
+        "dict_bytes": round(as_dicts / n, 1),
+        "record_bytes": round(as_records / n, 1),
+        "saved_pct": round(100 * (1 - as_records / as_dicts), 1),
+        "dict_total_mb": round(as_dicts / 2 ** 20, 2),
+        "record_total_mb": round(as_records / 2 ** 20, 2),
+    }
+
+def bench_windows(n: int, host_reference: bool) -> Dict[str, float]:
+    """Windows as the tracker builds them, each held as a dict versus as a TimeWindow."""
+    start = 1_700_000_000_000
+    build_window("project-0", "project-0-task-0", start, start + 60_000, host_reference) # Gathers the host details outside the measurement
+    windows = lambda: [build_window("project-0", f"project-0-task-{i % 50}", start + i * 60_000, start + (i + 1) * 60_000,
+                                    host_reference) for i in range(n)]
+    as_dicts = held_bytes(lambda: [window.to_json() for window in windows()])
+    as_records = held_bytes(windows)
+    return summarize(n, as_dicts, as_records)
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    backend = FakeBackend(FakeBackendConfig(n_projects=args.projects, m_tasks=max(1, args.tasks // args.projects)))
+    backend.server.server_close() # Only its generated data is needed
+    summaries = [json.dumps(tasks) for tasks in backend.tasks_by_project.values()]
+    by_project: Dict[str, List[Dict[str, Any]]] = {}
+    for task in backend.tasks.values():
+        by_project.setdefault(task["projectId"], []).append(task)
+    details = [json.dumps(tasks) for tasks in by_project.values()]
+    return {
+        "projects": compare([json.dumps(list(backend.projects.values()))], Project),
+        "task_summaries": compare(summaries, Task),
+        "task_details": compare(details, Task),
+        "windows_inline_host": bench_windows(args.windows, host_reference=False),
+        "windows_host_ref": bench_windows(args.windows, host_reference=True),
+    }
+
+def print_report(results: Dict[str, Dict[str, float]]):
+    print(f"\n{'items':<22}{'n':>8}{'dict B':>10}{'record B':>10}{'saved':>8}{'dict MB':>10}{'record MB':>11}")
+    for name, row in results.items():
+        print(f"{name:<22}{row['n']:>8}{row['dict_bytes']:>10}{row['record_bytes']:>10}{row['saved_pct']:>7}%"
+              f"{row['dict_total_mb']:>10}{row['record_total_mb']:>11}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Memory held by projects, tasks and windows: dicts versus records.")
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=10_000, help="total tasks, spread over the projects")
+    parser.add_argument("--windows", type=int, default=10_000)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Client benchmark suite, run against a local stand-in backend.
+
+    python -m benchmarks.run                        # all scenarios, default sizes
+    python -m benchmarks.run --projects 50 --tasks 1000 --latency-ms 80
+    python -m benchmarks.run --json after.json --compare before.json
+
+Reports p50/p99 latencies and throughput per scenario. Results can be saved as
+JSON and compared against a previous run.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Any
+
+# Runs from a scratch directory (config.ini, outbox and snapshot are created there), so pin the repo on the path first
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchmarks.fake_backend import FakeBackend, FakeBackendConfig
+from services.api_client import APIClient
+from services.snapshot_store import SnapshotStore
+from services.sync_engine import SyncEngine
+from services.transport import TransportSettings
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))]
+
+def summarize(samples_ms: List[float], items: int = 0, elapsed_s: float = 0.0) -> Dict[str, float]:
+    summary = {
+        "n": len(samples_ms),
+        "p50_ms": round(percentile(samples_ms, 0.50), 2),
+        "p99_ms": round(percentile(samples_ms, 0.99), 2),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 2) if samples_ms else float("nan"),
+    }
+    if items and elapsed_s:
+        summary["throughput_per_s"] = round(items / elapsed_s, 1)
+    return summary
+
+def timed(fn: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+def new_client(backend: FakeBackend, logged_in: bool = True) -> APIClient:
+    client = APIClient(settings=TransportSettings(base_url=backend.base_url))
+    if logged_in:
+        client.token = FakeBackend.TOKEN
+    return client
+
+def bench_api(backend: FakeBackend, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Cold-cache APIClient calls: startup sequence, project list, task list and assigned-task details."""
+    results: Dict[str, List[float]] = {"startup": [], "get_projects": [], "get_tasks_for_project": [],
+                                       "task_details": [], "sync_tasks_delta": []}
+    user = backend.user
+    project_ids = user["projects"]
+    for i in range(repeat):
+        client = new_client(backend, logged_in=False)
+        results["startup"].append(timed(lambda: (
+            client.login("bench@example.com", "secret"), client.get_projects(client.get_current_user())
+        )))
+        client.cache.invalidate()
+        results["get_projects"].append(timed(lambda: client.get_projects(user)))
+
+        project_id = project_ids[i % len(project_ids)]
+        tasks = []
+        results["get_tasks_for_project"].append(timed(lambda: tasks.extend(client.get_tasks_for_project(project_id))))
+        assigned = [task["id"] for task in tasks if FakeBackend.USER_ID in task["employees"]]
+        results["task_details"].append(timed(lambda: client.get_tasks_by_ids(assigned)))
+
+        # Delta sync after one task changed, starting from an up-to-date local index
+        snapshot = SnapshotStore(f"bench_sync_{i}.json")
+        snapshot.load(client.token)
+        sync = SyncEngine(client, snapshot)
+        sync.sync_tasks(project_id)
+        backend.rename_task(tasks[0]["id"], f"Renamed {i}")
+        results["sync_tasks_delta"].append(timed(lambda: sync.sync_tasks(project_id)))
+        client.client.close()
+    return {name: summarize(samples) for name, samples in results.items()}
+
+def bench_ui(backend: FakeBackend, repeat: int) -> Dict[str, Dict[str, float]]:
+    """MainWindow under the offscreen Qt platform: projects ready after open, tasks and details ready after a switch."""
+    from PySide6.QtWidgets import QApplication
+    from services.outbox import Outbox
+    from ui.main_window import MainWindow
+    from workers.request_executor import RequestExecutor
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    executor = RequestExecutor()
+    outbox = Outbox("bench_outbox.db")
+
+    def pump_until(condition: Callable[[], bool], timeout: float = 60.0):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("UI did not settle in time")
+            app.processEvents()
+            time.sleep(0.001)
+
+    load_projects, switch_project = [], []
+    for i in range(repeat):
+        client = new_client(backend)
+        snapshot = SnapshotStore(f"bench_snapshot_{i}.json") # Empty: measures a cold start
+        snapshot.load(client.token)
+        started = time.perf_counter()
+        window = MainWindow(client, backend.user, outbox, executor, snapshot)
+        pump_until(lambda: window.project_combo.count() > 1 and executor.pending_count() == 0)
+        load_projects.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        window.project_combo.setCurrentIndex(1 + i % (window.project_combo.count() - 1))
+        pump_until(lambda: window.shown_tasks is not None and executor.pending_count() == 0)
+        switch_project.append((time.perf_counter() - started) * 1000)
+        window.close()
+        client.client.close()
+    executor.shutdown()
+    return {"load_projects": summarize(load_projects), "switch_project": summarize(switch_project)}
+
+def bench_tracking(backend: FakeBackend, n_windows: int, seconds: int) -> Dict[str, Dict[str, float]]:
+    """TrackingWorker clock accuracy and UploadWorker drain throughput, single and bulk."""
+    from PySide6.QtCore import QCoreApplication, Qt
+    from services.outbox import Outbox
+    from services.uploader import Uploader
+    from workers.tracking_worker import TrackingWorker
+    from workers.upload_worker import UploadWorker
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    results = {}
+
+    # Clock: one-second windows for a few seconds; how far do window lengths stray from 1000 ms?
+    windows = []
+    worker = TrackingWorker("project-0", "project-0-task-0", window_seconds=1)
+    worker.window_ready_to_send.connect(windows.append, Qt.DirectConnection)
+    worker.start()
+    time.sleep(seconds + 0.5)
+    worker.stop()
+    worker.wait() # The final window is emitted on the worker thread
+    full = [w["end"] - w["start"] for w in windows[:-1]] # The last window is the partial one cut by stop()
+    results["window_length_error"] = summarize([abs(length - 1000) for length in full])
+
+    # Upload: drain a pre-filled outbox
+    for mode, bulk_size in (("single", 0), ("bulk", 50)):
+        client = new_client(backend)
+        outbox = Outbox(f"bench_upload_{mode}.db")
+        uploader = UploadWorker(Uploader(client, outbox, FakeBackend.USER_ID, bulk_size=bulk_size, max_batch_delay=0))
+        start = int(time.time() * 1000)
+        for i in range(n_windows):
+            uploader.enqueue({"start": start + i * 60000, "end": start + (i + 1) * 60000, "timezoneOffset": 0,
+                              "projectId": "project-0", "taskId": "project-0-task-0", "computer": "bench-host",
+                              "user": "bench", "domain": None, "os": "Linux", "osVersion": "6.0", "hwid": "0x1"})
+        before = backend.windows_received
+        started = time.perf_counter()
+        uploader.start()
+        while outbox.depth(FakeBackend.USER_ID) > 0 and time.perf_counter() - started < 120:
+            app.processEvents()
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - started
+        uploader.stop()
+        delivered = backend.windows_received - before
+        # Uploads overlap, so report throughput and the mean cost per window rather than percentiles
+        results[f"upload_{mode}"] = {
+            "n": delivered, "mean_ms": round(elapsed * 1000 / max(1, delivered), 2),
+            "throughput_per_s": round(delivered / elapsed, 1),
+        }
+        client.client.close()
+    return results
+
+def bench_journal(n_checkpoints: int) -> Dict[str, Dict[str, float]]:
+    """Session journal checkpoint cost, with the default group-committed fsync and with an fsync every time."""
+    from services.session_journal import SessionJournal
+    results = {}
+    for name, fsync_interval in (("checkpoint", 10.0), ("checkpoint_fsync_each", 0.0)):
+        journal = SessionJournal(f"bench_{name}.journal", fsync_interval)
+        now = int(time.time() * 1000)
+        journal.start({"owner": FakeBackend.USER_ID, "projectId": "project-0", "taskId": "project-0-task-0"}, now)
+        samples = []
+        started = time.perf_counter()
+        for i in range(n_checkpoints):
+            samples.append(timed(lambda: journal.checkpoint(now, now + i * 1000)))
+            if i % 60 == 59:
+                journal.new_chunk(now + i * 1000) # A window boundary every 60 checkpoints, as in real use
+        results[name] = summarize(samples, n_checkpoints, time.perf_counter() - started)
+        journal.finish()
+    return results
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    print("\nChange vs. baseline (p50 / p99 / throughput):")
+    for scenario, metrics in current["results"].items():
+        for name, summary in metrics.items():
+            before = baseline.get("results", {}).get(scenario, {}).get(name)
+            if not before:
+                continue
+            deltas = []
+            for key in ("p50_ms", "p99_ms", "throughput_per_s"):
+                if key in summary and before.get(key):
+                    deltas.append(f"{key} {(summary[key] - before[key]) / before[key] * 100:+.1f}%")
+            if deltas:
+                print(f"  {scenario}.{name}: {', '.join(deltas)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the desktop client against a local stand-in backend.")
+    parser.add_argument("--projects", type=int, default=30)
+    parser.add_argument("--tasks", type=int, default=200, help="tasks per project")
+    parser.add_argument("--assigned", type=float, default=0.25, help="fraction of tasks assigned to the user")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--bulk-tasks", action="store_true", help="let the backend serve GET /v1/task/bulk")
+    parser.add_argument("--no-change-feeds", action="store_true", help="make the backend lack the delta sync feeds")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--windows", type=int, default=300, help="windows to upload in the upload scenarios")
+    parser.add_argument("--clock-seconds", type=int, default=3)
+    parser.add_argument("--checkpoints", type=int, default=600, help="checkpoints to write in the journal scenario")
+    parser.add_argument("--scenarios", default="api,ui,tracking,journal")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="compare against results from a previous --json run")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    os.chdir(tempfile.mkdtemp(prefix="t3-bench-"))
+    backend = FakeBackend(FakeBackendConfig(
+        n_projects=args.projects, m_tasks=args.tasks, assigned_fraction=args.assigned,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        bulk_tasks=args.bulk_tasks, change_feeds=not args.no_change_feeds
+    )).start()
+
+    scenarios = {
+        "api": lambda: bench_api(backend, args.repeat),
+        "ui": lambda: bench_ui(backend, args.repeat),
+        "tracking": lambda: bench_tracking(backend, args.windows, args.clock_seconds),
+        "journal": lambda: bench_journal(args.checkpoints),
+    }
+    report = {"parameters": vars(args), "results": {}}
+    try:
+        for name in args.scenarios.split(","):
+            print(f"Running {name}...")
+            report["results"][name] = scenarios[name]()
+    finally:
+        backend.stop()
+
+    print(f"\n{'scenario':<34}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}{'per s':>10}")
+    for scenario, metrics in report["results"].items():
+        for name, summary in metrics.items():
+            print(f"{scenario + '.' + name:<34}{summary['n']:>6}{summary.get('p50_ms', ''):>10}{summary.get('p99_ms', ''):>10}"
+                  f"{summary.get('throughput_per_s', ''):>10}")
+
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    if baseline:
+        compare(report, baseline)
+
+if __name__ == "__main__":
+    main()
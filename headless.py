@@ -0,0 +1,203 @@
+"""
+Headless time tracker: the same tracking and upload engine as the desktop
+app, without loading Qt. Meant for VDI and terminal-server hosts.
+
+    python headless.py login you@example.com
+    python headless.py projects
+    python headless.py tasks <project_id>
+    python headless.py track <project_id> <task_id> [--duration SECONDS]
+    python headless.py upload
+    python headless.py status
+    python headless.py logout
+
+`python main.py --headless <command> ...` is equivalent. Tracking runs until
+Ctrl+C / SIGTERM (or --duration), then sends the final window and gives the
+uploader a few seconds to deliver it; anything left stays in the outbox.
+"""
+import argparse
+import getpass
+import signal
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+from services.api_client import APIClient, is_auth_error
+from services.log_pipeline import setup_logging
+from services.outbox import Outbox
+from services.session_journal import SessionJournal
+from services.snapshot_store import SnapshotStore
+from services.system_info import warm_up_system_info
+from services.tracking_engine import TrackingEngine, HIDDEN_REFRESH_SECONDS, recover_interrupted_session
+from services.uploader import Uploader
+
+def format_elapsed(seconds: int) -> str:
+    h, m, s = seconds // 3600, (seconds % 3600) // 60, seconds % 60
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+def resolve_user(api_client: APIClient) -> Optional[dict]:
+    """Returns the logged-in user, from the backend or, if it is unreachable, from the local snapshot."""
+    if not api_client.token:
+        return None
+    snapshot = SnapshotStore.for_config(api_client.config.filename)
+    snapshot.load(api_client.token)
+    try:
+        user = api_client.fetch_current_user()
+        snapshot.save_user(user)
+        return user
+    except Exception as e:
+        if is_auth_error(e):
+            return None
+        print(f"Backend unreachable ({e}); using the last known user.")
+        return snapshot.get_user()
+
+def drain(uploader: Uploader, outbox: Outbox, owner_id: str, timeout: float) -> int:
+    """Waits until the owner's outbox is empty or `timeout` seconds have passed. Returns the windows left."""
+    uploader.flush()
+    deadline = time.monotonic() + timeout
+    while outbox.depth(owner_id) and time.monotonic() < deadline:
+        time.sleep(0.2)
+    return outbox.depth(owner_id)
+
+def start_uploader(api_client: APIClient, outbox: Outbox, owner_id: str) -> Tuple[Uploader, threading.Thread]:
+    uploader = Uploader.from_config(api_client.config, api_client, outbox, owner_id)
+    thread = threading.Thread(target=uploader.run, name="uploader", daemon=True)
+    thread.start()
+    return uploader, thread
+
+def cmd_login(api_client: APIClient, args) -> int:
+    password = getpass.getpass("Password: ")
+    if not api_client.login(args.email, password):
+        print("Login failed.")
+        return 1
+    user = resolve_user(api_client)
+    print(f"Welcome, {user.get('name', 'User') if user else 'User'}!")
+    return 0
+
+def cmd_logout(api_client: APIClient, args) -> int:
+    SnapshotStore.for_config(api_client.config.filename).clear()
+    api_client.logout()
+    print("Logged out.")
+    return 0
+
+def cmd_status(api_client: APIClient, args, user: dict) -> int:
+    outbox = Outbox()
+    print(f"Logged in as {user.get('name', 'User')} ({user.get('id')})")
+    print(f"{outbox.depth(user.get('id'))} window(s) waiting to upload")
+    outbox.close()
+    return 0
+
+def cmd_projects(api_client: APIClient, args, user: dict) -> int:
+    projects = api_client.get_projects(user)
+    if projects is None:
+        print("Could not load projects.")
+        return 1
+    for project in projects:
+        print(f"{project['id']}\t{project.get('name', '')}")
+    return 0
+
+def cmd_tasks(api_client: APIClient, args, user: dict) -> int:
+    tasks = api_client.get_tasks_for_project(args.project_id)
+    if tasks is None:
+        print("Could not load tasks.")
+        return 1
+    assigned = [task for task in tasks if user.get('id') in task.get('employees', [])]
+    for task in assigned:
+        print(f"{task['id']}\t{task.get('name', '')}")
+    return 0
+
+def cmd_upload(api_client: APIClient, args, user: dict) -> int:
+    outbox = Outbox()
+    recover_interrupted_session(SessionJournal.for_config(api_client.config.filename), outbox)
+    uploader, thread = start_uploader(api_client, outbox, user['id'])
+    left = drain(uploader, outbox, user['id'], args.timeout)
+    uploader.stop()
+    thread.join()
+    outbox.close()
+    print(f"{left} window(s) still waiting to upload" if left else "All windows uploaded.")
+    return 0 if not left else 1
+
+def cmd_track(api_client: APIClient, args, user: dict) -> int:
+    task = api_client.get_tasks_by_ids([args.task_id]).get(args.task_id)
+    if task is not None and user.get('id') not in task.get('employees', []):
+        print("You are not assigned to this task.")
+        return 1
+
+    config = api_client.config
+    outbox = Outbox()
+    recover_interrupted_session(SessionJournal.for_config(config.filename), outbox)
+    warm_up_system_info()
+    uploader, upload_thread = start_uploader(api_client, outbox, user['id'])
+    engine = TrackingEngine.from_config(
+        config, args.project_id, args.task_id, owner_id=user['id'],
+        on_time_updated=lambda seconds: print(f"Tracked {format_elapsed(seconds)}"),
+        on_window_ready=uploader.enqueue,
+    )
+    engine.ui_refresh_seconds = args.status_interval
+    tracking_thread = threading.Thread(target=engine.run, name="tracking")
+
+    stop_requested = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_requested.set())
+
+    print(f"Tracking task {args.task_id}. Press Ctrl+C to stop.")
+    tracking_thread.start()
+    stop_requested.wait(args.duration or None)
+
+    engine.stop()
+    tracking_thread.join()
+    print(f"Stopped after {format_elapsed(engine.elapsed_seconds)}.")
+    left = drain(uploader, outbox, user['id'], args.drain_timeout)
+    uploader.stop()
+    upload_thread.join()
+    outbox.close()
+    if left:
+        print(f"{left} window(s) will be uploaded on the next run.")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="headless.py", description="Time tracker without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    login = commands.add_parser("login", help="log in and store the access token")
+    login.add_argument("email")
+    commands.add_parser("logout", help="forget the stored access token")
+    commands.add_parser("status", help="show the logged-in user and the upload queue")
+    commands.add_parser("projects", help="list your projects")
+    tasks = commands.add_parser("tasks", help="list the tasks assigned to you in a project")
+    tasks.add_argument("project_id")
+
+    track = commands.add_parser("track", help="track time on a task until interrupted")
+    track.add_argument("project_id")
+    track.add_argument("task_id")
+    track.add_argument("--duration", type=float, default=0, help="stop after this many seconds")
+    track.add_argument("--status-interval", type=int, default=HIDDEN_REFRESH_SECONDS * 4,
+                       help="seconds between progress lines")
+    track.add_argument("--drain-timeout", type=float, default=10.0,
+                       help="seconds to wait for pending windows to upload before exiting")
+
+    upload = commands.add_parser("upload", help="upload pending windows and exit")
+    upload.add_argument("--timeout", type=float, default=60.0)
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    api_client = APIClient()
+    # Diagnostics go to the log file and stderr; the command's own output stays on stdout
+    setup_logging(api_client.config)
+    if args.command == "login":
+        return cmd_login(api_client, args)
+    if args.command == "logout":
+        return cmd_logout(api_client, args)
+
+    user = resolve_user(api_client)
+    if not user:
+        print("Not logged in. Run: python headless.py login <email>")
+        return 1
+    handlers = {
+        "status": cmd_status, "projects": cmd_projects, "tasks": cmd_tasks,
+        "track": cmd_track, "upload": cmd_upload,
+    }
+    return handlers[args.command](api_client, args, user)
+
+if __name__ == "__main__":
+    sys.exit(main())
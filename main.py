@@ -1,41 +1,231 @@
+import logging
 import sys
-from PySide6.QtWidgets import QApplication
-from services.api_client import APIClient
-from ui.login_window import LoginWindow
-from ui.main_window import MainWindow 
+import time
+
+STARTED_AT = time.perf_counter() # Origin of the startup timeline
+
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    # Headless mode never loads Qt; see headless.py
+    sys.argv.remove("--headless")
+    from headless import main as headless_main
+    sys.exit(headless_main())
+
+PROFILE_STARTUP = "--profile-startup" in sys.argv[1:]
+if PROFILE_STARTUP:
+    sys.argv.remove("--profile-startup")
+
+from services.config_manager import ConfigManager
+from services.log_pipeline import setup_logging
+from services.startup_profile import StartupProfile
+
+startup_profile = StartupProfile(STARTED_AT)
+with startup_profile.phase("import", "PySide6"):
+    from PySide6.QtCore import Qt, QTimer
+    from PySide6.QtWidgets import QApplication
+from ui.shell_window import ShellWindow
+# Everything else (the API client and httpx, the main and login windows, the outbox, the stall detector)
+# is imported by MainApplication.start_services, after the first paint
+
+logger = logging.getLogger(__name__)
+
+# Requests whose timing belongs on the startup timeline
+STARTUP_REQUEST_KEYS = ("startup-user", "startup-projects", "projects", "tasks")
 
 class MainApplication:
-    def __init__(self):
-        self.app = QApplication(sys.argv)
-        self.api_client = APIClient()
+    """
+    Starts the tracker in stages, so a window is on screen before anything slow happens:
+
+    1. Qt, config.ini and an empty shell window; nothing else is imported yet.
+    2. After the shell's first paint: the API client, the token check and a
+       project prefetch (concurrently, in the background), the outbox and
+       the real main or login window, which replaces the shell.
+    3. Stall detection and metrics export.
+
+    No network call happens before the first paint, so the time to first
+    paint does not depend on the backend.
+    """
+    def __init__(self, profile: StartupProfile):
+        self.profile = profile
+        with profile.phase("ui", "QApplication"):
+            self.app = QApplication(sys.argv)
+        with profile.phase("config", "config.ini"):
+            self.config = ConfigManager()
+        with profile.phase("config", "logging"):
+            self.log_pipeline = setup_logging(self.config)
+        profile.first_paint_target_ms = self.config.get_int("Startup", "first_paint_target_ms", 250)
+        self.api_client = None
+        self.executor = None
         self.main_window = None
         self.login_window = None
-        
-        # Check if we are already logged in from a previous session
-        user_data = self.api_client.get_current_user()
-        if user_data:
-            print("Already logged in. Showing main window.")
+        self.stall_detector = None
+        self.metrics_exporter = None
+        self._services_started = False
+
+        with profile.phase("ui", "shell window"):
+            self.shell = ShellWindow()
+            self.shell.first_painted.connect(self.on_first_paint)
+            self.shell.show()
+        # In case the shell is never painted (e.g. started minimized), carry on anyway
+        QTimer.singleShot(max(100, profile.first_paint_target_ms), self.start_services)
+        # Close the timeline even if startup requests hang
+        QTimer.singleShot(30_000, self.finish_startup)
+
+    def on_first_paint(self):
+        self.profile.mark_first_paint()
+        # Return to the event loop first, so the painted frame reaches the screen
+        QTimer.singleShot(0, self.start_services)
+
+    def start_services(self):
+        """Stage 2: loads everything the shell didn't need and replaces it with the real window."""
+        if self._services_started:
+            return
+        self._services_started = True
+
+        with self.profile.phase("import", "API client"):
+            from services.api_client import APIClient
+            from services.snapshot_store import SnapshotStore
+            from services.sync_engine import SyncEngine
+            from workers.request_executor import RequestExecutor
+        with self.profile.phase("config", "API client"):
+            self.api_client = APIClient(config=self.config)
+            self.executor = RequestExecutor()
+            self.executor.on_finished = self.on_request_finished
+            self.snapshot = SnapshotStore.for_config(self.config.filename)
+
+        cached_user = None
+        if self.api_client.token:
+            with self.profile.phase("config", "snapshot"):
+                self.snapshot.load(self.api_client.token)
+                cached_user = self.snapshot.get_user()
+            # Check the token and pull the projects at the same time; both run while the UI below loads
+            self.executor.submit(
+                self.api_client.fetch_current_user,
+                key="startup-user", on_result=self.on_startup_user_loaded, on_error=self.on_startup_user_failed
+            )
+            if cached_user is None:
+                self.executor.submit(SyncEngine(self.api_client, self.snapshot).prefetch_projects, key="startup-projects")
+
+        with self.profile.phase("import", "outbox and tracking"):
+            from services.outbox import Outbox
+            from services.session_journal import SessionJournal
+            from services.tracking_engine import recover_interrupted_session
+        with self.profile.phase("config", "outbox and journal recovery"):
+            self.outbox = Outbox()
+            # Queue the time an interrupted session tracked but never sent; it uploads once its user is logged in.
+            # Off the GUI thread: building the window may wait for the host's domain lookup.
+            self.executor.submit(recover_interrupted_session, SessionJournal.for_config(self.config.filename),
+                                 self.outbox, key="startup-recovery")
+
+        if cached_user:
+            # Warm start: render the last known state right away; the token check revalidates it
+            logger.info("Restoring previous session from local snapshot.")
+            self.show_main_window(cached_user)
+        elif self.api_client.token:
+            self.shell.status_label.setText("Signing in...")
+        else:
+            logger.info("Not logged in. Showing login window.")
+            self.show_login_window()
+
+        self.start_metrics()
+        self.maybe_finish_startup()
+
+    def start_metrics(self):
+        """Starts the GUI stall detector and the periodic metrics export configured in [Metrics]."""
+        with self.profile.phase("import", "metrics"):
+            from services.metrics import MetricsExporter, metrics
+            from workers.stall_detector import StallDetector
+        config = self.config
+        self.stall_detector = StallDetector(
+            threshold_ms=config.get_int("Metrics", "stall_threshold_ms", 200),
+            interval_ms=config.get_int("Metrics", "stall_interval_ms", 500)
+        )
+        # Only watch the event loop while the app is in the foreground
+        self.app.applicationStateChanged.connect(
+            lambda state: self.stall_detector.set_active(state == Qt.ApplicationActive)
+        )
+        self.stall_detector.start()
+
+        export_path = config.get_value("Metrics", "export_path", "metrics.json")
+        if export_path:
+            self.metrics_exporter = MetricsExporter(metrics, export_path, config.get_int("Metrics", "export_interval", 60))
+            self.metrics_exporter.start()
+
+    def on_request_finished(self, handle):
+        """Puts startup requests on the timeline and ends it once the first window has everything it asked for."""
+        if handle.key in STARTUP_REQUEST_KEYS:
+            self.profile.record("network", handle.key, (handle.submitted_at - STARTED_AT) * 1000, self.profile.now_ms())
+        self.maybe_finish_startup()
+
+    def maybe_finish_startup(self):
+        if (self.main_window or self.login_window) and self.executor.pending_count() == 0:
+            self.finish_startup()
+
+    def finish_startup(self):
+        if not self.profile.finish():
+            return
+        if self.executor:
+            self.executor.on_finished = None
+        logger.info("Started in %.0fms, first paint at %.0fms", self.profile.now_ms(), self.profile.first_paint_ms or 0)
+        if PROFILE_STARTUP:
+            print(self.profile.format())
+
+    def on_startup_user_loaded(self, user_data: dict):
+        """Handles the background check of a restored session's token."""
+        self.snapshot.save_user(user_data)
+        if self.main_window:
+            self.main_window.apply_user(user_data)
+        else:
+            logger.info("Already logged in. Showing main window.")
             self.show_main_window(user_data)
+
+    def on_startup_user_failed(self, error: Exception):
+        """Falls back to the login window, unless we are showing a snapshot and only the network failed."""
+        from services.api_client import is_auth_error
+        if self.main_window and not is_auth_error(error):
+            logger.warning("Backend unreachable. Continuing with the local snapshot.")
+            return
+        logger.info("Not logged in. Showing login window.")
+        if self.main_window:
+            self.main_window.handle_logout()
         else:
-            print("Not logged in. Showing login window.")
             self.show_login_window()
 
+    def show_window(self, window):
+        """Shows a window, in place of the shell while that is still up."""
+        if self.shell is not None:
+            self.shell.replace_with(window)
+            self.shell = None
+        else:
+            window.show()
+
     def show_login_window(self):
         """Creates and shows the login window."""
-        self.login_window = LoginWindow(self.api_client)
-        self.login_window.login_successful.connect(self.show_main_window)
-        self.login_window.show()
+        with self.profile.phase("import", "login window"):
+            from ui.login_window import LoginWindow
+        self.login_window = LoginWindow(self.api_client, self.executor)
+        self.login_window.login_successful.connect(self.on_login_successful)
+        self.show_window(self.login_window)
+
+    def on_login_successful(self, user_data: dict):
+        """Starts a fresh snapshot for the new token and shows the main window."""
+        self.snapshot.load(self.api_client.token)
+        self.snapshot.save_user(user_data)
+        self.show_main_window(user_data)
 
     def show_main_window(self, user_data: dict):
         """Creates and shows the main tracker window after a successful login."""
-        print(f"Welcome, {user_data.get('name', 'User')}!")
-        self.main_window = MainWindow(self.api_client, user_data)
-        # --- CONNECT LOGOUT SIGNAL ---
-        self.main_window.logout_requested.connect(self.handle_logout)
-        self.main_window.show()
+        logger.info("Welcome, %s!", user_data.get('name', 'User'))
+        with self.profile.phase("import", "main window"):
+            from ui.main_window import MainWindow
+        with self.profile.phase("ui", "main window"):
+            self.main_window = MainWindow(self.api_client, user_data, self.outbox, self.executor, self.snapshot)
+            # --- CONNECT LOGOUT SIGNAL ---
+            self.main_window.logout_requested.connect(self.handle_logout)
+            self.show_window(self.main_window)
 
     def handle_logout(self):
         """Closes the main window and shows the login window."""
+        self.snapshot.clear()
         if self.main_window:
             self.main_window.close()
             self.main_window = None
@@ -43,8 +233,19 @@ class MainApplication:
 
     def run(self):
         """Starts the application's event loop."""
-        sys.exit(self.app.exec())
+        exit_code = self.app.exec()
+        if self.executor:
+            self.executor.shutdown()
+        if self.api_client:
+            from workers.shutdown import wait_for_stopped_workers
+            wait_for_stopped_workers()
+        if self.stall_detector:
+            self.stall_detector.stop()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+        self.log_pipeline.stop()
+        sys.exit(exit_code)
 
 if __name__ == "__main__":
-    main_app = MainApplication()
+    main_app = MainApplication(startup_profile)
     main_app.run()
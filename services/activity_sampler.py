@@ -0,0 +1,246 @@
+"""
+Activity sampling for time windows: system and process CPU load and how long
+the user has been away from keyboard and mouse.
+
+Samples are kept in fixed-size array-backed ring buffers, so memory use is
+constant however long tracking runs, and are reduced to a small summary per
+time window. The sampler measures its own CPU cost and stretches its interval
+whenever that cost would exceed `max_cost_percent` of one core.
+"""
+import array
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from .config_manager import ConfigManager
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError: # Optional dependency; without it only input idle time is sampled
+    psutil = None
+
+class RingBuffer:
+    """A fixed-capacity buffer of floats that overwrites its oldest values."""
+    __slots__ = ("capacity", "_values", "_next", "count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._values = array.array('d', bytes(8 * capacity)) # Zero-filled, allocated once
+        self._next = 0
+        self.count = 0
+
+    def append(self, value: float):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def values(self) -> List[float]:
+        """The buffered values, oldest first."""
+        if self.count < self.capacity:
+            return self._values[:self.count].tolist()
+        return self._values[self._next:].tolist() + self._values[:self._next].tolist()
+
+_UNSET = object()
+_idle_reader: Any = _UNSET # Built once per process; see input_idle_reader
+_idle_reader_lock = threading.Lock()
+
+def input_idle_reader() -> Optional[Callable[[], float]]:
+    """
+    The shared reader of input idle time, built on first use. On X11 it holds
+    an open display connection for the life of the process, so it is built
+    once instead of per sampler.
+    """
+    global _idle_reader
+    with _idle_reader_lock:
+        if _idle_reader is _UNSET:
+            _idle_reader = _input_idle_reader()
+        return _idle_reader
+
+def _input_idle_reader() -> Optional[Callable[[], float]]:
+    """
+    Returns a function giving the seconds since the last keyboard or mouse input
+    on this desktop, or None if the platform offers no way to read it.
+    """
+    try:
+        if sys.platform == "win32":
+            class LASTINPUTINFO(ctypes.Structure):
+                _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+            user32, kernel32 = ctypes.windll.user32, ctypes.windll.kernel32
+            kernel32.GetTickCount.restype = ctypes.c_uint
+
+            def read() -> float:
+                info = LASTINPUTINFO(ctypes.sizeof(LASTINPUTINFO), 0)
+                user32.GetLastInputInfo(ctypes.byref(info))
+                return ((kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000
+            return read
+
+        if sys.platform == "darwin":
+            services = ctypes.cdll.LoadLibrary(ctypes.util.find_library("ApplicationServices"))
+            seconds_since = services.CGEventSourceSecondsSinceLastEventType
+            seconds_since.restype = ctypes.c_double
+            seconds_since.argtypes = [ctypes.c_int32, ctypes.c_uint32]
+            # Combined session state, any input event type
+            return lambda: seconds_since(0, 0xFFFFFFFF)
+
+        if os.environ.get("DISPLAY"):
+            class XScreenSaverInfo(ctypes.Structure):
+                _fields_ = [("window", ctypes.c_ulong), ("state", ctypes.c_int), ("kind", ctypes.c_int),
+                            ("til_or_since", ctypes.c_ulong), ("idle", ctypes.c_ulong), ("eventMask", ctypes.c_ulong)]
+            xlib = ctypes.cdll.LoadLibrary(ctypes.util.find_library("X11"))
+            xss = ctypes.cdll.LoadLibrary(ctypes.util.find_library("Xss"))
+            xlib.XOpenDisplay.restype = ctypes.c_void_p
+            xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+            xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+            xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+            xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+            xss.XScreenSaverQueryInfo.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)]
+            display = xlib.XOpenDisplay(None)
+            if not display:
+                return None
+            root, info = xlib.XDefaultRootWindow(display), xss.XScreenSaverAllocInfo()
+            lock = threading.Lock() # The display and info struct are shared by every sampler
+
+            def read() -> float:
+                with lock:
+                    xss.XScreenSaverQueryInfo(display, root, info)
+                    return info.contents.idle / 1000
+            return read
+    except (OSError, AttributeError, TypeError) as e: # Missing library or symbol
+        logger.info("Input idle time is not available: %s", e)
+    return None
+
+class ActivitySampler:
+    """
+    Samples activity every `interval` seconds on a background thread.
+
+    When input idle time is available and passes `idle_threshold` seconds,
+    `on_idle` is called with the idle time so far; `on_active` is called once
+    input resumes. Both run on the sampler thread.
+    """
+    def __init__(self, interval: float = 5.0, idle_threshold: float = 300.0, capacity: int = 256,
+                 max_cost_percent: float = 1.0, max_interval: float = 60.0):
+        self.base_interval = interval
+        self.interval = interval
+        self.max_interval = max_interval
+        self.idle_threshold = idle_threshold
+        self.max_cost_percent = max_cost_percent
+        self.on_idle: Optional[Callable[[float], None]] = None
+        self.on_active: Optional[Callable[[], None]] = None
+        self.is_idle = False
+        self.samples_total = 0
+        self.mean_cost_ms = 0.0 # Exponentially weighted CPU time per sample
+        self._times = RingBuffer(capacity) # Sample timestamps, in ms
+        self._cpu = RingBuffer(capacity) # System-wide CPU load, percent
+        self._process_cpu = RingBuffer(capacity) # This process's CPU load, percent of one core
+        self._idle = RingBuffer(capacity) # Seconds since the last input; -1 when unknown
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._read_idle = input_idle_reader()
+        self._process = psutil.Process() if psutil else None
+
+    @classmethod
+    def from_config(cls, config: ConfigManager) -> Optional["ActivitySampler"]:
+        """Creates a sampler from the [Activity] section of config.ini, or returns None if sampling is disabled."""
+        if not config.get_bool("Activity", "enabled", True):
+            return None
+        return cls(
+            interval=config.get_float("Activity", "sample_seconds", 5.0),
+            idle_threshold=config.get_int("Activity", "idle_minutes", 5) * 60,
+            max_cost_percent=config.get_float("Activity", "max_cost_percent", 1.0),
+        )
+
+    def start(self):
+        if psutil:
+            # The first reading only sets the baseline that later ones are measured against
+            psutil.cpu_percent(interval=None)
+            self._process.cpu_percent(interval=None)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="activity-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._cond.wait_for(lambda: self._stopping, self.interval):
+                    return
+            started = time.thread_time()
+            self.sample()
+            self._account_cost((time.thread_time() - started) * 1000)
+
+    def sample(self):
+        """Takes one sample and checks for the user going idle or coming back."""
+        cpu = psutil.cpu_percent(interval=None) if psutil else 0.0
+        process_cpu = self._process.cpu_percent(interval=None) if self._process else 0.0
+        idle = self._read_idle() if self._read_idle else -1.0
+        with self._lock:
+            self._times.append(time.time() * 1000)
+            self._cpu.append(cpu)
+            self._process_cpu.append(process_cpu)
+            self._idle.append(idle)
+        self.samples_total += 1
+
+        if idle < 0:
+            return
+        if not self.is_idle and idle >= self.idle_threshold:
+            self.is_idle = True
+            logger.info("No input for %.0fs; user is idle.", idle)
+            if self.on_idle:
+                self.on_idle(idle)
+        elif self.is_idle and idle < self.idle_threshold:
+            self.is_idle = False
+            logger.info("Input resumed; user is active.")
+            if self.on_active:
+                self.on_active()
+
+    def _account_cost(self, cost_ms: float):
+        """Records a sample's CPU cost and widens or restores the interval to keep within the budget."""
+        self.mean_cost_ms = cost_ms if self.samples_total == 1 else 0.8 * self.mean_cost_ms + 0.2 * cost_ms
+        metrics.observe("activity_sample_cost_ms", cost_ms)
+        budget_ms = self.interval * 1000 * self.max_cost_percent / 100
+        if self.mean_cost_ms > budget_ms and self.interval < self.max_interval:
+            self.interval = min(self.max_interval, self.interval * 2)
+            metrics.inc("activity_sampler_backoffs_total")
+            logger.warning("Activity sampling costs %.1fms per sample; sampling every %.0fs.", self.mean_cost_ms, self.interval)
+        elif self.interval > self.base_interval and self.mean_cost_ms < budget_ms / 4:
+            self.interval = max(self.base_interval, self.interval / 2)
+
+    def summarize(self, start: int, end: int) -> Dict[str, Any]:
+        """
+        Reduces the samples taken between `start` and `end` (ms) to min/mean/max
+        CPU figures and the seconds without input, for a window's payload.
+        """
+        with self._lock:
+            rows = [row for row in zip(self._times.values(), self._cpu.values(), self._process_cpu.values(),
+                                       self._idle.values()) if start <= row[0] < end]
+        summary: Dict[str, Any] = {"samples": len(rows), "sampleCostMs": round(self.mean_cost_ms, 3)}
+        if not rows:
+            return summary
+        for key, column in (("cpu", 1), ("processCpu", 2)):
+            values = [row[column] for row in rows]
+            summary[key] = {"min": min(values), "mean": round(sum(values) / len(values), 1), "max": max(values)}
+
+        # Time without input: each sample vouches for at most the time since the previous one (or the window start)
+        idle_seconds = None
+        if all(row[3] >= 0 for row in rows):
+            idle_seconds, previous = 0.0, start
+            for sampled_at, _, _, idle in rows:
+                idle_seconds += min(idle, (sampled_at - previous) / 1000)
+                previous = sampled_at
+        summary["idleSeconds"] = None if idle_seconds is None else round(idle_seconds, 1)
+        return summary
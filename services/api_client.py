@@ -1,19 +1,165 @@
+import json
+import logging
+import re
+import threading
+import time
 import httpx
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Tuple, Iterator
 from .config_manager import ConfigManager
+from .metrics import metrics
+from .records import as_json
+from .transport import CircuitBreaker, TransportSettings, RETRYABLE_STATUSES, build_http_client
+from .window_codec import encode_windows
+
+logger = logging.getLogger(__name__)
+
+# Default freshness lifetime, in seconds, for each class of cached GET endpoint
+DEFAULT_CACHE_TTLS = {
+    "user": 60,
+    "project": 300,
+    "tasks": 30,
+    "task": 120,
+    "task_time": 15,
+}
+
+# Most ids sent in one bulk request, keeping its query string well within URL length limits
+BULK_CHUNK_SIZE = 100
+
+def route_of(path: str) -> str:
+    """Collapses resource ids in a path (/v1/task/abc -> /v1/task/{id}) so metrics stay low-cardinality."""
+    return re.sub(r"/(project|task)/(?!bulk$)[^/]+", r"/\1/{id}", path)
+
+def chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """Splits a list into consecutive slices of at most `size` items."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def is_missing_route(res: httpx.Response) -> bool:
+    """True if a response means the backend has no such endpoint, not that it refused or throttled the request."""
+    return res.status_code == 501 or (res.is_client_error and res.status_code not in (401, 403, 429))
+
+def is_auth_error(error: Exception) -> bool:
+    """True if an exception means the stored token is no longer accepted by the backend."""
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code in (401, 403)
+
+class _CacheEntry:
+    """A cached response body plus the validators needed to revalidate it."""
+    __slots__ = ("body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, body: bytes, etag: Optional[str], last_modified: Optional[str], expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+class ResponseCache:
+    """
+    A thread-safe, memory-bounded LRU cache of GET response bodies.
+
+    Bodies are stored as raw bytes, so the memory bound is exact and every hit
+    returns a freshly decoded object that callers are free to mutate.
+    """
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "coalesced": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[_CacheEntry]:
+        """Returns the entry for a key (fresh or stale) and marks it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: _CacheEntry):
+        """Stores an entry, evicting least recently used ones to stay within the memory bound."""
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.body)
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, prefix: str = ""):
+        """Drops every entry whose key starts with `prefix` (everything by default)."""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._size -= len(self._entries.pop(key).body)
+
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the hit/miss counters together with the current size of the cache."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._size
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
 
 class APIClient:
     """
     A client to handle all communication with the T3 backend API.
     """
-    def __init__(self, base_url: str = "http://127.0.0.1:8000/api"):
-        self.base_url = base_url
-        self.client = httpx.Client()
-        self.config = ConfigManager()
+    def __init__(self, base_url: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 transport: Optional[httpx.BaseTransport] = None, settings: Optional[TransportSettings] = None,
+                 config: Optional[ConfigManager] = None):
+        self.config = config or ConfigManager()
+        # Pooling, timeouts, retries and the circuit breaker come from the [Network] config section
+        self.settings = settings or TransportSettings.from_config(self.config)
+        self.base_url = (base_url or self.settings.base_url).rstrip("/")
+        # Built on first use: creating its TLS context takes ~100ms, which should not be spent on the GUI thread at startup
+        self._transport = transport
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self.breaker = CircuitBreaker(self.settings.breaker_threshold, self.settings.breaker_reset)
         self._token: Optional[str] = self.config.get_token()
-        
-        if self._token:
-            self.client.headers["Authorization"] = f"Bearer {self._token}"
+        # Upper bound on parallel requests when fetching many resources at once
+        self.max_concurrency = max_concurrency or self.config.get_int("Network", "max_concurrency", 8)
+        # Learned on first use: None until we know whether the backend has a bulk task endpoint
+        self._bulk_tasks_supported: Optional[bool] = None
+        # Likewise for the bulk task time endpoint
+        self._bulk_task_times_supported: Optional[bool] = None
+        # Likewise for each changes feed used by delta sync, keyed by its path
+        self._changes_supported: Dict[str, Optional[bool]] = {}
+
+        # GET response cache, with per-endpoint TTLs overridable from the [Cache] config section
+        self.cache = ResponseCache(max_bytes=self.config.get_int("Cache", "max_bytes", 4 * 1024 * 1024))
+        self.cache_ttls = {
+            endpoint: self.config.get_int("Cache", f"ttl_{endpoint}", ttl)
+            for endpoint, ttl in DEFAULT_CACHE_TTLS.items()
+        }
+        # Single-flight: identical GETs in progress share one request
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Response bytes downloaded so far; the prefetcher paces itself by it
+        self.bytes_received = 0
+
+    @property
+    def client(self) -> httpx.Client:
+        """The pooled HTTP client, built on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    client = build_http_client(self.settings, self._transport)
+                    if self._token:
+                        client.headers["Authorization"] = f"Bearer {self._token}"
+                    self._client = client
+        return self._client
 
     @property
     def token(self) -> Optional[str]:
@@ -22,18 +168,68 @@ class APIClient:
     @token.setter
     def token(self, value: Optional[str]):
         self._token = value
+        # Cached responses belong to the previous user
+        self.cache.invalidate()
         if self._token:
-            self.client.headers["Authorization"] = f"Bearer {self._token}"
+            if self._client is not None:
+                self._client.headers["Authorization"] = f"Bearer {self._token}"
             self.config.save_token(self._token)
         else:
-            self.client.headers.pop("Authorization", None)
+            if self._client is not None:
+                self._client.headers.pop("Authorization", None)
             self.config.clear_token()
 
+    def _send(self, method: str, path: str, endpoint_class: str, idempotent: bool = False, **kwargs) -> httpx.Response:
+        """
+        Sends a request through the circuit breaker with the endpoint class's timeouts.
+        Idempotent requests are retried with jittered exponential backoff on transport
+        errors and on 429/502/503/504 responses. Non-idempotent requests are never retried.
+        """
+        url = f"{self.base_url}{path}"
+        timeout = self.settings.timeout_for(endpoint_class)
+        labels = {"method": method, "route": route_of(path)}
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_request()
+            except httpx.TransportError:
+                metrics.inc("http_errors_total", dict(labels, kind="circuit_open"))
+                raise
+            started = time.perf_counter()
+            try:
+                response = self.client.request(method, url, timeout=timeout, **kwargs)
+            except httpx.TransportError as e:
+                metrics.observe("http_request_duration_ms", (time.perf_counter() - started) * 1000, labels)
+                metrics.inc("http_errors_total", dict(labels, kind=type(e).__name__))
+                self.breaker.record_failure()
+                if not idempotent or attempt >= self.settings.max_retries:
+                    raise
+                delay = self.settings.backoff_delay(attempt)
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            else:
+                metrics.observe("http_request_duration_ms", (time.perf_counter() - started) * 1000, labels)
+                metrics.inc("http_requests_total", dict(labels, status=str(response.status_code)))
+                self.bytes_received += response.num_bytes_downloaded
+                if response.status_code >= 400:
+                    metrics.inc("http_errors_total", dict(labels, kind=f"http_{response.status_code // 100}xx"))
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if not idempotent or response.status_code not in RETRYABLE_STATUSES or attempt >= self.settings.max_retries:
+                    return response
+                delay = self.settings.backoff_delay(attempt, response.headers.get("Retry-After"))
+            attempt += 1
+            metrics.inc("http_retries_total", labels)
+            time.sleep(delay)
+
     def login(self, email: str, password: str) -> bool:
         """Logs in the user and stores the access token."""
         try:
-            response = self.client.post(
-                f"{self.base_url}/auth/login",
+            response = self._send(
+                "POST", "/auth/login", "auth",
                 data={"username": email, "password": password}
             )
             response.raise_for_status()
@@ -41,42 +237,144 @@ class APIClient:
             self.token = data.get("access_token")
             return bool(self.token)
         except Exception as e:
-            print(f"Login failed: {e}")
+            logger.warning("Login failed: %s", e)
             return False
 
     def logout(self):
         """Logs out the user by clearing the token."""
         self.token = None
 
+    def _get_json(self, path: str, endpoint: str, params: Optional[Dict[str, str]] = None,
+                  endpoint_class: str = "read") -> Any:
+        """
+        GETs a JSON resource through the response cache, raising on any transport or HTTP error.
+
+        Fresh entries are served without a request. Stale entries are revalidated with
+        If-None-Match / If-Modified-Since, and concurrent identical requests are coalesced
+        so only one of them reaches the network.
+        """
+        key = path if not params else f"{path}?{httpx.QueryParams(params)}"
+        cached = self._get_fresh(key)
+        if cached is not None:
+            return cached
+        self.cache.count("misses")
+        entry = self.cache.get(key)
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[key] = Future()
+        if not is_leader:
+            self.cache.count("coalesced")
+            return json.loads(future.result())
+
+        try:
+            body = self._fetch_into_cache(key, path, endpoint, params, entry, endpoint_class)
+            future.set_result(body)
+            return json.loads(body)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _fetch_into_cache(self, key: str, path: str, endpoint: str, params: Optional[Dict[str, str]],
+                          stale: Optional[_CacheEntry], endpoint_class: str) -> bytes:
+        """Performs the (possibly conditional) GET for a cache miss and stores the result."""
+        headers = {}
+        if stale is not None:
+            if stale.etag:
+                headers["If-None-Match"] = stale.etag
+            if stale.last_modified:
+                headers["If-Modified-Since"] = stale.last_modified
+
+        response = self._send("GET", path, endpoint_class, idempotent=True, params=params, headers=headers)
+        expires_at = time.monotonic() + self.cache_ttls.get(endpoint, 0)
+        if response.status_code == 304 and stale is not None:
+            self.cache.count("revalidated")
+            stale.expires_at = expires_at
+            return stale.body
+
+        response.raise_for_status()
+        body = response.content
+        self.cache.put(key, _CacheEntry(
+            body, response.headers.get("ETag"), response.headers.get("Last-Modified"), expires_at
+        ))
+        return body
+
+    def _get_fresh(self, key: str) -> Optional[Any]:
+        """Returns a decoded cached body if one is still fresh, without touching the network."""
+        entry = self.cache.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self.cache.count("hits")
+            return json.loads(entry.body)
+        return None
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Returns response cache statistics: hits, misses, revalidations, coalesced requests and size."""
+        return self.cache.snapshot()
+
+    def fetch_current_user(self) -> Dict[str, Any]:
+        """Fetches the details of the currently logged-in user, raising on any error."""
+        return self._get_json("/auth/me", "user", endpoint_class="auth")
+
     def get_current_user(self) -> Optional[Dict[str, Any]]:
         """Fetches the details of the currently logged-in user."""
         if not self.token: return None
         try:
-            response = self.client.get(f"{self.base_url}/auth/me")
-            response.raise_for_status()
-            return response.json()
+            return self.fetch_current_user()
         except Exception as e:
-            print(f"Failed to get user: {e}")
+            logger.warning("Failed to get user: %s", e)
             return None
 
-    def get_projects(self) -> Optional[List[Dict[str, Any]]]:
-        """Fetches the full details for all projects assigned to the current user."""
+    def _fetch_many(self, paths: Dict[str, str], endpoint: str) -> Iterator[Tuple[str, Optional[Any], Optional[str]]]:
+        """
+        GETs many resources concurrently through the cache, bounded by `max_concurrency`.
+        Yields (key, json, error) tuples in completion order; exactly one of json/error is set.
+        """
+        if not paths:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(paths))) as pool:
+            futures = {pool.submit(self._get_json, path, endpoint): key for key, path in paths.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    yield key, future.result(), None
+                except Exception as e:
+                    yield key, None, str(e)
+
+    def get_projects_with_errors(self, user: Optional[Dict[str, Any]] = None) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, str]]]:
+        """
+        Fetches the full details for all projects assigned to the user, concurrently.
+        Returns the projects that loaded (in assignment order) and a map of project id to error
+        for those that did not. Pass the already-fetched `user` to skip the /auth/me round-trip.
+        """
         if not self.token: return None
-        user = self.get_current_user()
-        if not user or 'projects' not in user: return []
+        if user is None:
+            user = self.get_current_user()
+        if not user or not user.get('projects'): return [], {}
         project_ids = user['projects']
-        if not project_ids: return []
-        
-        projects_data = []
-        try:
-            for project_id in project_ids:
-                res = self.client.get(f"{self.base_url}/v1/project/{project_id}")
-                res.raise_for_status()
-                projects_data.append(res.json())
-            return projects_data
-        except Exception as e:
-            print(f"Failed to get project details: {e}")
-            return None
+
+        loaded: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        for project_id, project, error in self._fetch_many({pid: f"/v1/project/{pid}" for pid in project_ids}, "project"):
+            if error is None:
+                loaded[project_id] = project
+            else:
+                errors[project_id] = error
+                logger.warning("Failed to get project details for %s: %s", project_id, error)
+        return [loaded[pid] for pid in project_ids if pid in loaded], errors
+
+    def get_projects(self, user: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetches the full details for all projects assigned to the current user.
+        Projects that fail to load are left out; see get_projects_with_errors.
+        """
+        result = self.get_projects_with_errors(user)
+        return None if result is None else result[0]
 
     def get_tasks_for_project(self, project_id: str) -> Optional[List[Dict[str, Any]]]:
         """Fetches tasks for a specific project that are assigned to the current user."""
@@ -84,11 +382,9 @@ class APIClient:
             return None
         try:
             # The backend route will automatically filter by the logged-in user from the token
-            response = self.client.get(f"{self.base_url}/v1/task", params={"projectId": project_id})
-            response.raise_for_status()
-            return response.json()
+            return self._get_json("/v1/task", "tasks", params={"projectId": project_id})
         except Exception as e:
-            print(f"Failed to get tasks for project {project_id}: {e}")
+            logger.warning("Failed to get tasks for project %s: %s", project_id, e)
             return None
         
     def get_tasks_by_task_id(self, task_id: str) -> Optional[List[Dict[str, Any]]]:
@@ -97,27 +393,139 @@ class APIClient:
             return None
         try:
             # The backend route will automatically filter by the logged-in user from the token
-            response = self.client.get(f"{self.base_url}/v1/task/{task_id}")
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(f"/v1/task/{task_id}", "task")
         except Exception as e:
-            print(f"Failed to get task for {task_id}: {e}")
+            logger.warning("Failed to get task for %s: %s", task_id, e)
             return None
         
+    def register_host(self, host_ref: str, host_info: dict):
+        """
+        Registers a host fingerprint so time windows can refer to it by `hostRef`
+        instead of repeating every host field. Raises on any transport or HTTP error.
+        """
+        res = self._send("POST", "/v1/hosts", "upload", json={"hostRef": host_ref, **host_info})
+        if res.status_code == 409:
+            return # Already registered, e.g. by a previous session
+        res.raise_for_status()
+
+    def submit_time_window(self, window_data: dict):
+        """Posts a time window to the backend, raising on any transport or HTTP error."""
+        res = self._send("POST", "/v1/time-entries", "upload", json=as_json(window_data))
+        res.raise_for_status()
+
+    def _fetch_tasks_bulk(self, task_ids: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Fetches many tasks in one request via the backend's bulk endpoint.
+        Returns None if the backend does not offer one, or could not serve these
+        ids, so the caller can fall back.
+        """
+        if self._bulk_tasks_supported is False:
+            return None
+        try:
+            res = self._send("GET", "/v1/task/bulk", "read", idempotent=True, params={"ids": ",".join(task_ids)})
+            if res.status_code == 414:
+                logger.info("Bulk task request for %s ids was too long; fetching them one by one.", len(task_ids))
+                return None
+            if is_missing_route(res) and self._bulk_tasks_supported is not True:
+                # No such route (it may even have matched /v1/task/{task_id}); stop asking
+                self._bulk_tasks_supported = False
+                return None
+            res.raise_for_status()
+            self._bulk_tasks_supported = True
+            tasks = {task['id']: task for task in res.json()}
+            # Seed the per-task cache so later single lookups are served locally
+            expires_at = time.monotonic() + self.cache_ttls["task"]
+            for task_id, task in tasks.items():
+                self.cache.put(f"/v1/task/{task_id}", _CacheEntry(json.dumps(task).encode(), None, None, expires_at))
+            for _ in task_ids:
+                self.cache.count("misses")
+            return tasks
+        except Exception as e:
+            logger.warning("Bulk task fetch failed, falling back to per-task requests: %s", e)
+            return None
+
+    def changes_supported(self, path: str) -> Optional[bool]:
+        """Whether the backend has the changes feed at `path`: None until a request has told."""
+        return self._changes_supported.get(path)
+
+    def get_changes(self, path: str, cursor: Optional[str], params: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Reads a changes feed (e.g. /v1/task/changes) from `cursor` onwards; with no
+        cursor the backend answers with everything. Returns the decoded page, or None
+        if the backend has no such feed. Raises on any other transport or HTTP error.
+        """
+        if not self.token or self._changes_supported.get(path) is False:
+            return None
+        params = dict(params or {})
+        if cursor:
+            params["since"] = cursor
+        res = self._send("GET", path, "read", idempotent=True, params=params)
+        if is_missing_route(res) and self._changes_supported.get(path) is None:
+            logger.info("Backend has no %s feed; falling back to full fetches.", path)
+            self._changes_supported[path] = False
+            return None
+        res.raise_for_status()
+        self._changes_supported[path] = True
+        return res.json()
+
+    def iter_tasks_by_ids(self, task_ids: List[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Fetches full details for many tasks, yielding (task_id, details) as each one arrives.
+        Uses the bulk endpoint when the backend has one, otherwise concurrent per-task requests.
+        `details` is None for tasks that failed to load.
+        """
+        if not self.token or not task_ids:
+            return
+        missing = []
+        for task_id in task_ids:
+            cached = self._get_fresh(f"/v1/task/{task_id}")
+            if cached is not None:
+                yield task_id, cached
+            else:
+                missing.append(task_id)
+        if not missing:
+            return
+        unserved = []
+        for chunk in chunked(missing, BULK_CHUNK_SIZE):
+            bulk = self._fetch_tasks_bulk(chunk)
+            if bulk is None:
+                unserved.extend(chunk)
+                continue
+            for task_id in chunk:
+                yield task_id, bulk.get(task_id)
+        if not unserved:
+            return
+        for task_id, task, error in self._fetch_many({tid: f"/v1/task/{tid}" for tid in unserved}, "task"):
+            if error is not None:
+                logger.warning("Failed to get task for %s: %s", task_id, error)
+            yield task_id, task
+
+    def get_tasks_by_ids(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetches full details for many tasks at once. Tasks that failed to load are left out."""
+        return {task_id: task for task_id, task in self.iter_tasks_by_ids(task_ids) if task}
+
+    def submit_time_windows_bulk(self, windows: List[dict], compression: str = "gzip"):
+        """
+        Posts many time windows in one request, packed in the compressed columnar
+        format from services.window_codec. Raises on any transport or HTTP error.
+        """
+        body, headers = encode_windows(windows, compression)
+        res = self._send("POST", "/v1/time-entries/bulk", "upload", content=body, headers=headers)
+        res.raise_for_status()
+
     def send_time_window(self, window_data: dict) -> bool:
         """Sends a collected time window to the backend."""
         if not self.token:
             return False
         try:
-            res = self.client.post(f"{self.base_url}/v1/time-entries", json=window_data)
-            res.raise_for_status()
-            print("Successfully sent time window to backend.")
+            self.submit_time_window(window_data)
+            logger.info("Successfully sent time window to backend.")
             return True
         except httpx.HTTPStatusError as e:
-            print(f"Failed to send time window: {e.response.status_code} - {e.response.text}")
+            logger.warning("Failed to send time window: %s - %s", e.response.status_code, e.response.text)
             return False
         except Exception as e:
-            print(f"An unexpected error occurred while sending time window: {e}")
+            logger.error("An unexpected error occurred while sending time window: %s", e)
             return False
         
     def get_task_time(self, employee_id: str, task_id: str) -> Optional[Dict[str, Any]]:
@@ -126,9 +534,65 @@ class APIClient:
             return None
         try:
             params = {"employeeId": employee_id, "taskId": task_id}
-            response = self.client.get(f"{self.base_url}/v1/analytics/task-time", params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json("/v1/analytics/task-time", "task_time", params=params)
         except Exception as e:
-            print(f"Failed to get task time for task {task_id}: {e}")
+            logger.warning("Failed to get task time for task %s: %s", task_id, e)
             return None
+
+    def _fetch_task_times_bulk(self, employee_id: str, task_ids: List[str]) -> Optional[Dict[str, int]]:
+        """
+        Fetches a user's totals for many tasks in one request via the bulk endpoint.
+        Returns None if the backend does not offer one, or could not serve these ids.
+        """
+        if self._bulk_task_times_supported is False:
+            return None
+        try:
+            res = self._send(
+                "GET", "/v1/analytics/task-time/bulk", "read", idempotent=True,
+                params={"employeeId": employee_id, "taskIds": ",".join(task_ids)}
+            )
+            if res.status_code == 414:
+                logger.info("Bulk task time request for %s ids was too long; fetching them one by one.", len(task_ids))
+                return None
+            if is_missing_route(res) and self._bulk_task_times_supported is not True:
+                self._bulk_task_times_supported = False
+                return None
+            res.raise_for_status()
+            self._bulk_task_times_supported = True
+            totals = dict.fromkeys(task_ids, 0) # Tasks the response leaves out have no time tracked
+            totals.update((item['taskId'], item.get('totalTimeMillis', 0)) for item in res.json())
+            return totals
+        except Exception as e:
+            logger.warning("Bulk task time fetch failed, falling back to per-task requests: %s", e)
+            return None
+
+    def get_task_times(self, employee_id: str, task_ids: List[str]) -> Dict[str, int]:
+        """
+        Fetches a user's total tracked time, in ms, for many tasks at once: in one request
+        when the backend has a bulk endpoint, otherwise with concurrent per-task requests.
+        Tasks the backend has no time data for count as 0; tasks whose total could not
+        be loaded are left out.
+        """
+        if not self.token or not employee_id or not task_ids:
+            return {}
+        totals = {}
+        unserved = []
+        for chunk in chunked(task_ids, BULK_CHUNK_SIZE):
+            bulk = self._fetch_task_times_bulk(employee_id, chunk)
+            if bulk is None:
+                unserved.extend(chunk)
+            else:
+                totals.update(bulk)
+        if not unserved:
+            return totals
+
+        paths = {
+            task_id: f"/v1/analytics/task-time?{httpx.QueryParams({'employeeId': employee_id, 'taskId': task_id})}"
+            for task_id in unserved
+        }
+        for task_id, time_data, error in self._fetch_many(paths, "task_time"):
+            if error is not None:
+                logger.warning("Failed to get task time for task %s: %s", task_id, error)
+            else:
+                totals[task_id] = time_data.get('totalTimeMillis', 0) if time_data else 0
+        return totals
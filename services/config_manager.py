@@ -30,6 +30,31 @@ class ConfigManager:
             self.config.remove_section('Auth')
             self._write_config()
 
+    def get_value(self, section: str, key: str, fallback: str) -> str:
+        """Reads a string setting, falling back to a default if it is missing."""
+        return self.config.get(section, key, fallback=fallback)
+
+    def get_int(self, section: str, key: str, fallback: int) -> int:
+        """Reads an integer setting, falling back to a default if it is missing or invalid."""
+        try:
+            return self.config.getint(section, key, fallback=fallback)
+        except ValueError:
+            return fallback
+
+    def get_float(self, section: str, key: str, fallback: float) -> float:
+        """Reads a decimal setting, falling back to a default if it is missing or invalid."""
+        try:
+            return self.config.getfloat(section, key, fallback=fallback)
+        except ValueError:
+            return fallback
+
+    def get_bool(self, section: str, key: str, fallback: bool) -> bool:
+        """Reads a yes/no setting (1/yes/true/on or 0/no/false/off), falling back to a default if it is missing or invalid."""
+        try:
+            return self.config.getboolean(section, key, fallback=fallback)
+        except ValueError:
+            return fallback
+
     def _write_config(self):
         """Writes the current configuration state to the file."""
         with open(self.filename, 'w') as configfile:
@@ -0,0 +1,198 @@
+"""
+Non-blocking, structured logging.
+
+Modules log through the standard library (`logger = logging.getLogger(__name__)`
+with %-style arguments). Once setup_logging() has run, every record goes
+through a bounded queue: the logging thread only checks the level and
+appends the record, never formatting it or touching a file. A background
+thread takes records off the queue, rate limits repeated warnings and
+errors, formats them and writes them to a size-rotated JSON-lines file
+(and to the console, when there is one).
+
+Records are formatted later on the writer thread, so log arguments should
+not be mutated after the call.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Dict, Optional, Tuple
+from .config_manager import ConfigManager
+from .metrics import metrics
+
+CONSOLE_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Libraries that log every request at INFO; the API client's own metrics and messages cover them
+QUIET_LOGGERS = ("httpx", "httpcore")
+
+# Attributes every LogRecord has; anything else was passed with `extra=` and goes into the JSON entry
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "suppressed_repeats"}
+
+class _EnqueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the queue untouched, leaving all formatting to the writer thread."""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block the caller on a backed-up writer; losing a log line is the lesser evil
+            metrics.inc("log_records_dropped_total")
+
+class RateLimiter:
+    """
+    Lets at most `burst` warnings or errors with the same logger, level and
+    message template through per `window` seconds. The ones held back are
+    counted, and the count is attached to the next record that gets through.
+    Used only by the writer thread, so it needs no lock.
+    """
+    def __init__(self, burst: int = 5, window: float = 60.0, min_level: int = logging.WARNING):
+        self.burst = burst
+        self.window = window
+        self.min_level = min_level
+        self._seen: Dict[Tuple[str, int, str], list] = {} # key -> [window start, passed, suppressed]
+
+    def allow(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or self.burst <= 0:
+            return True
+        now = time.monotonic()
+        key = (record.name, record.levelno, str(record.msg))
+        state = self._seen.get(key)
+        if state is None or now - state[0] >= self.window:
+            if len(self._seen) > 1000:
+                self._prune(now)
+            suppressed = state[2] if state else 0
+            self._seen[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed_repeats = suppressed
+            return True
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+        state[2] += 1
+        metrics.inc("log_records_suppressed_total", {"level": record.levelname})
+        return False
+
+    def _prune(self, now: float):
+        for key in [key for key, state in self._seen.items() if now - state[0] >= self.window and not state[2]]:
+            del self._seen[key]
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, thread, message, `extra=` fields and any traceback."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if getattr(record, "suppressed_repeats", 0):
+            entry["suppressed"] = record.suppressed_repeats
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class ConsoleFormatter(logging.Formatter):
+    """Plain text, noting how many repeats of a message were held back."""
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        if getattr(record, "suppressed_repeats", 0):
+            text += f" ({record.suppressed_repeats} similar messages suppressed)"
+        return text
+
+class _Listener(logging.handlers.QueueListener):
+    """The writer thread: rate limits each record once, then passes it to every handler."""
+    def __init__(self, log_queue: queue.Queue, rate_limiter: RateLimiter, *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.rate_limiter = rate_limiter
+
+    def handle(self, record: logging.LogRecord):
+        if self.rate_limiter.allow(record):
+            super().handle(record)
+
+    def start(self):
+        super().start()
+        self._thread.name = "log-writer"
+
+    def enqueue_sentinel(self):
+        # Wait for room rather than fail when stopping with a full queue; the writer is draining it
+        self.queue.put(self._sentinel)
+
+class LogPipeline:
+    """The installed queue, writer thread and handlers; stop() drains the queue and closes the files."""
+    def __init__(self, listener: _Listener, handler: _EnqueueHandler, log_path: Optional[str]):
+        self.listener = listener
+        self.handler = handler
+        self.log_path = log_path
+        self._stopped = False
+
+    def stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+def setup_logging(config: ConfigManager, console: Optional[bool] = None, console_level: Optional[str] = None) -> LogPipeline:
+    """
+    Routes all logging through the queue, configured from the [Logging] section of config.ini.
+    The log file goes next to config.ini. `console` defaults to whether the process has a
+    console at all (a windowed PyInstaller build has none).
+    """
+    level = logging.getLevelName(config.get_value("Logging", "level", "INFO").upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+    handlers = []
+
+    log_path = None
+    file_name = config.get_value("Logging", "file", "tracker.log")
+    if file_name:
+        log_path = os.path.join(os.path.dirname(os.path.abspath(config.filename)), file_name)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=config.get_int("Logging", "max_bytes", 1024 * 1024),
+            backupCount=config.get_int("Logging", "backup_count", 3), encoding="utf-8", delay=True
+        )
+        file_handler.setLevel(level)
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(file_handler)
+
+    if console is None:
+        console = sys.stderr is not None
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setLevel(console_level.upper() if console_level else level)
+        console_handler.setFormatter(ConsoleFormatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.Queue(maxsize=config.get_int("Logging", "queue_size", 10000))
+    rate_limiter = RateLimiter(
+        burst=config.get_int("Logging", "rate_limit_burst", 5),
+        window=config.get_int("Logging", "rate_limit_seconds", 60)
+    )
+    listener = _Listener(log_queue, rate_limiter, *handlers)
+    enqueue_handler = _EnqueueHandler(log_queue)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(enqueue_handler)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(max(level, logging.WARNING))
+    # Records below every handler's level are dropped by the caller's level check, before they are even created
+    root.setLevel(min([handler.level for handler in handlers] or [logging.CRITICAL + 1]))
+    listener.start()
+
+    pipeline = LogPipeline(listener, enqueue_handler, log_path)
+    atexit.register(pipeline.stop)
+    return pipeline
@@ -0,0 +1,162 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, in milliseconds
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted(labels.items())) if labels else ()
+
+def _render_labels(pairs: LabelKey) -> str:
+    if not pairs:
+        return ""
+    escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+class Histogram:
+    """A fixed-bucket histogram; observing a value is a binary search and two additions."""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last slot is the +Inf bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return float("inf")
+
+class MetricsRegistry:
+    """
+    An in-process store of counters, histograms and recent notable events.
+
+    Updates take one lock and a dict lookup, so instrumentation can stay on
+    in production. The registry can be exported as Prometheus text or JSON.
+    """
+    def __init__(self, max_events: int = 50):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._events: Dict[str, deque] = {}
+        self.max_events = max_events
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1):
+        """Adds to a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        """Records a value, in milliseconds, in a histogram."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def record_event(self, kind: str, data: Dict[str, Any]):
+        """Keeps the most recent events of a kind (e.g. GUI stalls with their stack) for the JSON export."""
+        with self._lock:
+            self._events.setdefault(kind, deque(maxlen=self.max_events)).append(dict(data, time=time.time()))
+
+    def to_json(self) -> Dict[str, Any]:
+        """Returns a JSON-serializable snapshot of every metric."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [{
+                    "labels": dict(key), "count": h.count, "sum": h.sum,
+                    "p50": h.quantile(0.5), "p90": h.quantile(0.9), "p99": h.quantile(0.99),
+                    "buckets": dict(zip([str(b) for b in h.buckets] + ["+Inf"], h.counts)),
+                } for key, h in series.items()]
+                for name, series in self._histograms.items()
+            }
+            events = {kind: list(items) for kind, items in self._events.items()}
+        return {"timestamp": time.time(), "counters": counters, "histograms": histograms, "events": events}
+
+    def to_prometheus(self) -> str:
+        """Renders the counters and histograms in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE t3_{name} counter")
+                for key, value in series.items():
+                    lines.append(f"t3_{name}{_render_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE t3_{name} histogram")
+                for key, h in series.items():
+                    cumulative = 0
+                    for bound, count in zip([str(b) for b in h.buckets] + ["+Inf"], h.counts):
+                        cumulative += count
+                        lines.append(f"t3_{name}_bucket{_render_labels(key + (('le', bound),))} {cumulative}")
+                    lines.append(f"t3_{name}_sum{_render_labels(key)} {h.sum}")
+                    lines.append(f"t3_{name}_count{_render_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Writes the metrics to `path`: Prometheus text for .prom files, JSON otherwise."""
+        content = self.to_prometheus() if path.endswith(".prom") else json.dumps(self.to_json(), indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+# The process-wide registry used by the API client, workers and stall detector
+metrics = MetricsRegistry()
+
+class MetricsExporter:
+    """Periodically writes a registry to a file from a background thread."""
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 60.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def export(self):
+        try:
+            self.registry.write(self.path)
+        except OSError as e:
+            logger.warning("Failed to export metrics to %s: %s", self.path, e)
+
+    def stop(self):
+        """Stops the exporter and writes one final snapshot."""
+        self._stop.set()
+        self.export()
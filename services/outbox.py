@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+from typing import Optional, Dict, Any, List, Tuple
+from .records import to_json
+
+class Outbox:
+    """
+    A durable, ordered queue of time windows waiting to be uploaded.
+
+    Windows are stored in a local SQLite database in WAL mode, so they survive
+    network outages, backend restarts and application crashes. Every window is
+    tagged with the id of the user who tracked it, so entries are only ever
+    drained with that user's credentials.
+    """
+    def __init__(self, filename="outbox.db"):
+        self.filename = filename
+        self._lock = threading.Lock()
+        # One connection shared by the tracking, uploader and UI threads; the lock serializes access.
+        self._conn = sqlite3.connect(self.filename, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is crash-safe in WAL mode; only an OS crash can lose the last commits.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS windows (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                owner TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                failed INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_windows_pending ON windows (owner, failed, id)")
+        # Host fingerprints referenced by windows sent in "reference" host info mode
+        self._conn.execute("CREATE TABLE IF NOT EXISTS hosts (ref TEXT PRIMARY KEY, info TEXT NOT NULL)")
+
+    def append(self, owner: str, window_data: Mapping) -> int:
+        """Stores a window at the tail of the queue and returns its entry id."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO windows (owner, payload, created_at) VALUES (?, ?, ?)",
+                (owner, json.dumps(window_data, default=to_json), time.time())
+            )
+            return cursor.lastrowid
+
+    def peek(self, owner: str, limit: int = 1) -> List[Tuple[int, Dict[str, Any]]]:
+        """Returns up to `limit` of the oldest pending windows for a user, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM windows WHERE owner = ? AND failed = 0 ORDER BY id LIMIT ?",
+                (owner, limit)
+            ).fetchall()
+        return [(entry_id, json.loads(payload)) for entry_id, payload in rows]
+
+    def oldest_age(self, owner: str) -> Optional[float]:
+        """Returns how many seconds the oldest pending window for a user has been waiting."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(created_at) FROM windows WHERE owner = ? AND failed = 0", (owner,)
+            ).fetchone()
+        return time.time() - row[0] if row[0] is not None else None
+
+    def ack(self, entry_ids: List[int]):
+        """Removes windows that the backend has accepted."""
+        if not entry_ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM windows WHERE id = ?", [(entry_id,) for entry_id in entry_ids])
+
+    def record_failure(self, entry_id: int, error: str, permanent: bool = False):
+        """
+        Records a failed upload attempt. Permanently failed windows are kept for
+        inspection but are no longer drained.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE windows SET attempts = attempts + 1, last_error = ?, failed = ? WHERE id = ?",
+                (error, 1 if permanent else 0, entry_id)
+            )
+
+    def save_host(self, ref: str, host_info: dict):
+        """Stores the host details behind a fingerprint reference, so it can be registered later."""
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO hosts (ref, info) VALUES (?, ?)", (ref, json.dumps(host_info)))
+
+    def get_host(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Returns the host details stored for a fingerprint reference."""
+        with self._lock:
+            row = self._conn.execute("SELECT info FROM hosts WHERE ref = ?", (ref,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def depth(self, owner: Optional[str] = None) -> int:
+        """Returns the number of windows still waiting to be uploaded."""
+        with self._lock:
+            if owner is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM windows WHERE failed = 0").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM windows WHERE owner = ? AND failed = 0", (owner,)
+                ).fetchone()
+        return row[0]
+
+    def close(self):
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,157 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from .api_client import APIClient
+from .metrics import metrics
+from .sync_engine import SyncEngine
+from .task_totals import TaskTotalsStore
+
+logger = logging.getLogger(__name__)
+
+# Priorities; lower runs first
+PRIORITY_HOVERED = 0 # The project under the pointer in the open project combo
+PRIORITY_RECENT = 10 # Recently used projects, plus their rank in the most-recent-first list
+
+class PrefetchScheduler:
+    """
+    Warms the local index and caches for projects the user is likely to open next,
+    so switching to one renders its tasks, names and totals without a round-trip.
+
+    For each requested project it syncs the task list into the snapshot, then
+    loads the details (into the response cache) and totals of the user's
+    assigned tasks. Requests are served in priority order, at most
+    `max_concurrency` at a time, only while `is_busy()` is false (e.g. while no
+    upload or foreground request is in flight) and within `max_bytes_per_second`
+    of downloads. A project synced less than `fresh_seconds` ago is skipped.
+
+    Runs on its own threads, independent of Qt.
+    """
+    def __init__(self, sync: SyncEngine, api_client: APIClient, user_id: Optional[str],
+                 totals: Optional[TaskTotalsStore] = None, max_concurrency: int = 1,
+                 max_bytes_per_second: int = 64 * 1024, fresh_seconds: float = 60.0,
+                 is_busy: Optional[Callable[[], bool]] = None, idle_poll: float = 0.25):
+        self.sync = sync
+        self.api_client = api_client
+        self.user_id = user_id
+        self.totals = totals
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_bytes_per_second = max_bytes_per_second
+        self.fresh_seconds = fresh_seconds
+        self.is_busy = is_busy or (lambda: False)
+        self.idle_poll = idle_poll
+        self._cond = threading.Condition()
+        self._queue: List[tuple] = [] # Heap of (priority, sequence, project id)
+        self._queued: Dict[str, int] = {} # Project id -> its current priority; stale heap entries are skipped
+        self._running = set()
+        self._sequence = itertools.count()
+        self._next_start = 0.0 # Monotonic time the bandwidth cap allows the next job to start
+        self._is_running = False
+        self._threads: List[threading.Thread] = []
+
+    @classmethod
+    def from_config(cls, config, sync: SyncEngine, api_client: APIClient, user_id: Optional[str],
+                    **kwargs) -> "PrefetchScheduler":
+        """Creates a scheduler with the limits from the [Prefetch] section of config.ini."""
+        settings = {
+            "max_concurrency": config.get_int("Prefetch", "max_concurrency", 1),
+            "max_bytes_per_second": config.get_int("Prefetch", "max_kbps", 64) * 1024,
+            "fresh_seconds": config.get_int("Prefetch", "fresh_seconds", 60),
+        }
+        settings.update(kwargs)
+        return cls(sync, api_client, user_id, **settings)
+
+    def start(self):
+        with self._cond:
+            if self._is_running:
+                return
+            self._is_running = True
+        for i in range(self.max_concurrency):
+            thread = threading.Thread(target=self._run, name=f"prefetch-{i}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def stop(self):
+        """Drops queued projects and lets the threads exit once their current project is done."""
+        with self._cond:
+            self._is_running = False
+            self._queue.clear()
+            self._queued.clear()
+            self._cond.notify_all()
+
+    def request(self, project_id: str, priority: int = PRIORITY_RECENT):
+        """Queues a project, or moves it up if it is already queued with a lower priority."""
+        if not project_id:
+            return
+        with self._cond:
+            if project_id in self._running or self._queued.get(project_id, priority + 1) <= priority:
+                return
+            self._queued[project_id] = priority
+            heapq.heappush(self._queue, (priority, next(self._sequence), project_id))
+            self._cond.notify()
+
+    def request_recent(self, project_ids: List[str]):
+        """Queues recently used projects, most recent first."""
+        for rank, project_id in enumerate(project_ids):
+            self.request(project_id, PRIORITY_RECENT + rank)
+
+    def pending(self) -> List[str]:
+        """The queued projects, in the order they will be prefetched."""
+        with self._cond:
+            return [pid for priority, _, pid in sorted(self._queue) if self._queued.get(pid) == priority]
+
+    def _take(self) -> Optional[str]:
+        """Blocks until a project may be prefetched and returns it, or None once stopped."""
+        with self._cond:
+            while self._is_running:
+                while self._queue and self._queued.get(self._queue[0][2]) != self._queue[0][0]:
+                    heapq.heappop(self._queue) # Superseded by a higher priority entry
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                delay = self._next_start - time.monotonic()
+                if delay <= 0 and not self.is_busy():
+                    _, _, project_id = heapq.heappop(self._queue)
+                    del self._queued[project_id]
+                    self._running.add(project_id)
+                    return project_id
+                # Over the bandwidth budget, or the app needs the network: look again shortly
+                self._cond.wait(max(delay, self.idle_poll))
+            return None
+
+    def _run(self):
+        while True:
+            project_id = self._take()
+            if project_id is None:
+                return
+            received_before = self.api_client.bytes_received
+            started = time.monotonic()
+            try:
+                self._prefetch(project_id)
+            except Exception as e:
+                metrics.inc("prefetch_failures_total")
+                logger.warning("Prefetch of project %s failed: %s", project_id, e)
+            # Downloads made while the job ran count against the budget, including any foreground ones
+            received = self.api_client.bytes_received - received_before
+            metrics.observe("prefetch_duration_ms", (time.monotonic() - started) * 1000)
+            with self._cond:
+                self._running.discard(project_id)
+                if self.max_bytes_per_second > 0:
+                    self._next_start = max(self._next_start, started + received / self.max_bytes_per_second)
+
+    def _prefetch(self, project_id: str):
+        """Warms the task list, assigned task details and totals of one project."""
+        tasks = self.sync.sync_tasks(project_id, max_age=self.fresh_seconds)
+        if tasks is None:
+            metrics.inc("prefetch_failures_total")
+            return
+        if not self._is_running:
+            return
+        assigned = [task['id'] for task in tasks if self.user_id in task.get('employees', [])]
+        if assigned:
+            self.api_client.get_tasks_by_ids(assigned)
+            if self.totals is not None and self._is_running:
+                self.totals.load(assigned)
+        metrics.inc("prefetch_projects_total")
@@ -0,0 +1,198 @@
+"""
+Compact in-memory records for projects, tasks and time windows.
+
+The backend's JSON objects become `__slots__` records instead of dicts. Ids
+are interned, so the same employee or project id is stored once however many
+records refer to it, and fields the client rarely reads (descriptions and
+anything else it does not know about) are kept as one compact JSON string,
+decoded only when asked for.
+
+Records are read-only Mappings over their JSON form, so `task['id']` and
+`task.get('employees', [])` work as they do on the dicts. `to_json()` (or
+`json.dumps(..., default=to_json)`) restores the original object.
+"""
+import json
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_shared: Dict[Tuple, Any] = {} # Canonical copies of small values many records repeat, keyed by value
+
+def intern_id(value: Any) -> Any:
+    """Interns a string id; other values are returned unchanged."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _share(key: Tuple, value: Any) -> Any:
+    """Returns the canonical copy of `value`, e.g. one tuple for every task with the same assignees."""
+    shared = _shared.get(key)
+    if shared is None:
+        if len(_shared) >= 10000:
+            _shared.clear() # Bounded; values repeat, so the cache refills with the common ones
+        shared = _shared[key] = value
+    return shared
+
+def _pack(data: Dict[str, Any], known: Mapping) -> Optional[str]:
+    """Encodes the fields of `data` the record does not keep as attributes, or None if there are none."""
+    if data.keys() <= known.keys():
+        return None # The common case: a summary with only the fields kept as attributes
+    return json.dumps({key: value for key, value in data.items() if key not in known}, separators=(",", ":"))
+
+def to_json(value: Any) -> Any:
+    """The JSON form of a record; usable as the `default` hook of json.dumps."""
+    if isinstance(value, Record):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def as_json(value: Any) -> Any:
+    """A record's JSON form, or the value itself if it is not a record."""
+    return value.to_json() if isinstance(value, Record) else value
+
+class Record(Mapping):
+    """
+    Base of the records: a read-only Mapping over the JSON keys in `_KEYS`
+    (JSON key -> attribute, in output order) plus whatever `_extra()` holds.
+    An attribute set to None means the key is absent.
+    """
+    __slots__ = ()
+    _KEYS: Dict[str, str] = {}
+
+    def _extra(self) -> Dict[str, Any]:
+        return {}
+
+    def __getitem__(self, key: str) -> Any:
+        attr = self._KEYS.get(key)
+        if attr is None:
+            return self._extra()[key]
+        value = getattr(self, attr)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for key, attr in self._KEYS.items():
+            if getattr(self, attr) is not None:
+                yield key
+        yield from self._extra()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is type(self):
+            # Compares the packed fields without decoding them
+            return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def to_json(self) -> Dict[str, Any]:
+        data = {}
+        for key, attr in self._KEYS.items():
+            value = getattr(self, attr)
+            if value is not None:
+                data[key] = value
+        extra = self._extra()
+        if extra:
+            data.update(extra)
+        return data
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_json()!r})"
+
+class Project(Record):
+    """A project: id and name, with every other field packed."""
+    __slots__ = ("id", "name", "_rest")
+    _KEYS = {"id": "id", "name": "name"}
+
+    def __init__(self, id: str, name: Optional[str] = None, rest: Optional[str] = None):
+        self.id = intern_id(id)
+        self.name = name
+        self._rest = rest
+
+    @classmethod
+    def from_json(cls, data: Mapping) -> "Project":
+        if isinstance(data, cls):
+            return data
+        return cls(data['id'], data.get('name'), _pack(data, cls._KEYS))
+
+    def _extra(self) -> Dict[str, Any]:
+        return json.loads(self._rest) if self._rest else {}
+
+class Task(Record):
+    """
+    A task: id, name and assigned employees, with every other field (e.g. the
+    description of a fully loaded task) packed. Tasks with the same assignees
+    share one tuple of interned employee ids.
+    """
+    __slots__ = ("id", "name", "employees", "_rest")
+    _KEYS = {"id": "id", "name": "name", "employees": "employees"}
+
+    def __init__(self, id: str, name: Optional[str] = None, employees: Optional[Tuple[str, ...]] = None,
+                 rest: Optional[str] = None):
+        self.id = intern_id(id)
+        self.name = name
+        self.employees = employees
+        self._rest = rest
+
+    @classmethod
+    def from_json(cls, data: Mapping) -> "Task":
+        if isinstance(data, cls):
+            return data
+        employees = data.get('employees')
+        if employees is not None:
+            try:
+                employees = tuple(map(sys.intern, employees))
+            except TypeError: # Not string ids
+                employees = tuple(employees)
+            employees = _share(employees, employees)
+        return cls(data['id'], data.get('name'), employees, _pack(data, cls._KEYS))
+
+    def to_json(self) -> Dict[str, Any]:
+        data = super().to_json()
+        if self.employees is not None:
+            data['employees'] = list(self.employees) # Held as a shared tuple
+        return data
+
+    def renamed(self, name: str) -> "Task":
+        """A copy with another name, sharing everything else."""
+        return Task(self.id, name, self.employees, self._rest)
+
+    def _extra(self) -> Dict[str, Any]:
+        return json.loads(self._rest) if self._rest else {}
+
+class TimeWindow(Record):
+    """
+    A tracked time window. The host details (inline host fields, identical for
+    every window from this machine) are one dict shared by all windows.
+    """
+    __slots__ = ("start", "end", "timezone_offset", "project_id", "task_id", "host_ref", "host", "activity")
+    _KEYS = {"start": "start", "end": "end", "timezoneOffset": "timezone_offset", "projectId": "project_id",
+             "taskId": "task_id", "hostRef": "host_ref"}
+
+    def __init__(self, start: int, end: int, timezone_offset: Optional[int], project_id: str, task_id: str,
+                 host_ref: Optional[str] = None, host: Optional[Dict[str, Any]] = None,
+                 activity: Optional[Dict[str, Any]] = None):
+        self.start = start
+        self.end = end
+        self.timezone_offset = timezone_offset
+        self.project_id = intern_id(project_id)
+        self.task_id = intern_id(task_id)
+        self.host_ref = intern_id(host_ref)
+        self.host = _share(tuple(sorted(host.items())), host) if host else None
+        self.activity = activity
+
+    def _extra(self) -> Dict[str, Any]:
+        if self.host is None and self.activity is None:
+            return {}
+        extra = dict(self.host or {})
+        if self.activity is not None:
+            extra["activity"] = self.activity
+        return extra
+
+    def __getitem__(self, key: str) -> Any:
+        # Saves building the merged extra fields for the keys read most often
+        if key == "activity" and self.activity is not None:
+            return self.activity
+        if self.host is not None and key in self.host:
+            return self.host[key]
+        return super().__getitem__(key)
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Optional, Dict, Any, List
+from .records import Project, Task, to_json
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout of the snapshot file changes; older files are ignored
+SNAPSHOT_VERSION = 2
+
+class SnapshotStore:
+    """
+    Persists the last known user, projects and tasks so the main window can be
+    rendered instantly on the next launch, before the backend has answered.
+
+    The snapshot is scoped to the auth token it was fetched with: a snapshot
+    written for one token is never served for another, and it is deleted on logout.
+    Projects and tasks are held as compact records (see services/records.py).
+    The recently used projects live in a small file of their own, so recording a
+    project switch never rewrites the whole snapshot.
+    """
+    def __init__(self, filename: str = "snapshot.json", recent_filename: Optional[str] = None):
+        self.filename = filename
+        self.recent_filename = recent_filename or os.path.join(os.path.dirname(filename), "recent_projects.json")
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {}
+        self._recent: List[str] = []
+        # Writes happen outside _lock; versions keep an older state from overwriting a newer one on disk
+        self._write_lock = threading.Lock()
+        self._version = 0
+        self._written_version = 0
+
+    @staticmethod
+    def for_config(config_filename: str) -> "SnapshotStore":
+        """Creates a store that lives in the same directory as the given config file."""
+        directory = os.path.dirname(os.path.abspath(config_filename))
+        return SnapshotStore(os.path.join(directory, "snapshot.json"))
+
+    @staticmethod
+    def _token_scope(token: str) -> str:
+        # Only a digest of the token is written to disk
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def load(self, token: Optional[str]) -> bool:
+        """
+        Loads the snapshot from disk for the given token.
+        Returns True if a usable snapshot was found.
+        """
+        with self._lock:
+            self._data = self._empty(token) if token else {}
+            self._recent = self._load_recent(token) if token else []
+            if not token or not os.path.exists(self.filename):
+                return False
+            try:
+                with open(self.filename, 'r') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable snapshot: %s", e)
+                return False
+            if data.get("version") != SNAPSHOT_VERSION or data.get("scope") != self._token_scope(token):
+                return False
+            if data.get("projects") is not None:
+                data["projects"] = [Project.from_json(project) for project in data["projects"]]
+            # Tasks are converted to records per project, when first read
+            self._data = data
+            return True
+
+    def _load_recent(self, token: str) -> List[str]:
+        try:
+            with open(self.recent_filename, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return []
+        return list(data.get("projects", [])) if data.get("scope") == self._token_scope(token) else []
+
+    def _empty(self, token: str) -> Dict[str, Any]:
+        return {"version": SNAPSHOT_VERSION, "scope": self._token_scope(token), "user": None, "projects": None, "tasks": {}, "cursors": {}}
+
+    def get_user(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._data.get("user")
+
+    def get_projects(self) -> Optional[List[Project]]:
+        with self._lock:
+            return self._data.get("projects")
+
+    def get_tasks(self, project_id: str) -> Optional[List[Task]]:
+        with self._lock:
+            tasks = self._data.get("tasks", {}).get(project_id)
+            if tasks and not isinstance(tasks[0], Task):
+                tasks = self._data["tasks"][project_id] = [Task.from_json(task) for task in tasks]
+            return tasks
+
+    def get_cursor(self, key: str) -> Optional[str]:
+        """The delta sync cursor the stored copy of a collection (e.g. "projects", "tasks:<id>") is current as of."""
+        with self._lock:
+            return self._data.get("cursors", {}).get(key)
+
+    def get_recent_projects(self) -> List[str]:
+        """Ids of the projects the user opened, most recent first."""
+        with self._lock:
+            return list(self._recent)
+
+    def touch_project(self, project_id: str, limit: int = 5):
+        """Moves a project to the front of the recently used list, keeping at most `limit` entries."""
+        with self._lock:
+            if not self._data:
+                return
+            self._recent = [project_id] + [pid for pid in self._recent if pid != project_id][:max(0, limit - 1)]
+            contents = {"scope": self._data["scope"], "projects": self._recent}
+        tmp_filename = f"{self.recent_filename}.tmp"
+        try:
+            with open(tmp_filename, 'w') as f:
+                json.dump(contents, f)
+            os.replace(tmp_filename, self.recent_filename)
+        except OSError as e:
+            logger.warning("Failed to write recent projects: %s", e)
+
+    def save_user(self, user: Dict[str, Any]):
+        self._update(lambda data: data.__setitem__("user", user))
+
+    def save_projects(self, projects: List[Dict[str, Any]], cursor: Optional[str] = None):
+        """Stores the projects; a `cursor` records the delta sync position they are current as of."""
+        projects = [Project.from_json(project) for project in projects]
+        def change(data):
+            data["projects"] = projects
+            if cursor is not None:
+                data["cursors"]["projects"] = cursor
+        self._update(change)
+
+    def save_tasks(self, project_id: str, tasks: List[Dict[str, Any]], cursor: Optional[str] = None):
+        """Stores a project's tasks; a `cursor` records the delta sync position they are current as of."""
+        tasks = [Task.from_json(task) for task in tasks]
+        def change(data):
+            data["tasks"][project_id] = tasks
+            if cursor is not None:
+                data["cursors"][f"tasks:{project_id}"] = cursor
+        self._update(change)
+
+    def _update(self, change):
+        """
+        Applies a change to the in-memory snapshot, then writes it to disk atomically.
+        Readers only wait for the change itself, never for the encoding or the write.
+        """
+        with self._lock:
+            if not self._data:
+                return # Nothing loaded for the current token
+            change(self._data)
+            self._version += 1
+            version = self._version
+            # Stored lists are replaced, never modified, so copying the containers is enough for a stable view
+            data = dict(self._data, tasks=dict(self._data.get("tasks", {})), cursors=dict(self._data.get("cursors", {})))
+        with self._write_lock:
+            if version < self._written_version:
+                return # A newer state is already on disk
+            tmp_filename = f"{self.filename}.tmp"
+            try:
+                with open(tmp_filename, 'w') as f:
+                    f.write(json.dumps(data, default=to_json)) # One C-encoder pass; json.dump streams through the slow Python encoder
+                os.replace(tmp_filename, self.filename)
+            except OSError as e:
+                logger.warning("Failed to write snapshot: %s", e)
+            self._written_version = version
+
+    def clear(self):
+        """Forgets the snapshot and the recently used projects, e.g. on logout."""
+        with self._lock:
+            self._data = {}
+            self._recent = []
+            self._version += 1
+            version = self._version
+        with self._write_lock:
+            self._written_version = version # Drops writes of the state before the logout
+            for filename in (self.filename, self.recent_filename):
+                try:
+                    os.remove(filename)
+                except FileNotFoundError:
+                    pass
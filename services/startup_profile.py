@@ -0,0 +1,68 @@
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+from .metrics import metrics
+
+class StartupProfile:
+    """
+    A timeline of the phases of one application start: imports, config,
+    network and UI, measured from `origin` (the moment main.py started running).
+
+    Phases are always recorded as metrics, so slow starts in the field show up
+    in the metrics export; the timeline itself is only printed with --profile-startup.
+    """
+    def __init__(self, origin: Optional[float] = None, first_paint_target_ms: float = 250.0):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.first_paint_target_ms = first_paint_target_ms
+        self.phases: List[Tuple[str, str, float, float]] = [] # (kind, name, start ms, end ms)
+        self.first_paint_ms: Optional[float] = None
+        self.finished = False
+
+    def now_ms(self) -> float:
+        return (time.perf_counter() - self.origin) * 1000
+
+    @contextmanager
+    def phase(self, kind: str, name: str):
+        """Times the enclosed block as one phase, e.g. `with profile.phase("import", "PySide6"):`."""
+        start = self.now_ms()
+        try:
+            yield
+        finally:
+            self.record(kind, name, start, self.now_ms())
+
+    def record(self, kind: str, name: str, start_ms: float, end_ms: float):
+        """Adds a phase that was timed elsewhere, e.g. a request that ran on a pool thread."""
+        if self.finished:
+            return
+        self.phases.append((kind, name, start_ms, end_ms))
+        metrics.observe("startup_phase_duration_ms", end_ms - start_ms, {"kind": kind, "phase": name})
+
+    def mark_first_paint(self):
+        """Records the moment the first window was painted; only the first call counts."""
+        if self.first_paint_ms is not None:
+            return
+        self.first_paint_ms = self.now_ms()
+        metrics.observe("startup_first_paint_ms", self.first_paint_ms)
+        if self.first_paint_ms > self.first_paint_target_ms:
+            metrics.inc("startup_first_paint_over_target_total")
+
+    def finish(self) -> bool:
+        """Ends the timeline; later phases are not recorded. Returns False if it had already ended."""
+        if self.finished:
+            return False
+        self.finished = True
+        metrics.observe("startup_ready_ms", self.now_ms())
+        return True
+
+    def format(self) -> str:
+        """Renders the timeline as a table, in the order the phases started."""
+        lines = ["Startup timeline (ms since launch):",
+                 f"  {'kind':<8}{'phase':<32}{'start':>9}{'end':>9}{'took':>9}"]
+        for kind, name, start, end in sorted(self.phases, key=lambda phase: phase[2]):
+            lines.append(f"  {kind:<8}{name:<32}{start:>9.1f}{end:>9.1f}{end - start:>9.1f}")
+        if self.first_paint_ms is not None:
+            verdict = "met" if self.first_paint_ms <= self.first_paint_target_ms else "MISSED"
+            lines.append(f"First paint at {self.first_paint_ms:.1f} ms "
+                         f"(target {self.first_paint_target_ms:.0f} ms: {verdict})")
+        lines.append(f"Ready at {self.now_ms():.1f} ms")
+        return "\n".join(lines)
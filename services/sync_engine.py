@@ -0,0 +1,175 @@
+"""
+Delta sync of projects and tasks into the local snapshot.
+
+The backend may offer a changes feed per collection:
+
+    GET /v1/project/changes?since=<cursor>
+    GET /v1/task/changes?projectId=<id>&since=<cursor>
+
+    {"cursor": "<opaque>", "full": false, "items": [...], "deleted": ["<id>", ...]}
+
+With no `since` (or a cursor the backend no longer accepts) it answers with
+"full": true and every item. The cursor is opaque to the client; an
+updatedSince timestamp works as well as a sequence number. Backends without
+the feed are detected on first use and synced with full fetches instead.
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+from .api_client import APIClient
+from .metrics import metrics
+from .records import Project, Task
+from .snapshot_store import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+PROJECT_CHANGES_PATH = "/v1/project/changes"
+TASK_CHANGES_PATH = "/v1/task/changes"
+
+def apply_changes(current: List[Dict[str, Any]], page: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Merges one changes page into a list of items: changed items are replaced in
+    place, new ones appended and deleted ones dropped. A full page replaces the list.
+    """
+    if page.get("full"):
+        return list(page.get("items", []))
+    updated = {item['id']: item for item in page.get("items", [])}
+    deleted = set(page.get("deleted", []))
+    merged = []
+    for item in current:
+        if item['id'] in deleted:
+            continue
+        merged.append(updated.pop(item['id'], item))
+    merged.extend(updated.values())
+    return merged
+
+class SyncEngine:
+    """
+    Keeps the snapshot's projects and tasks up to date, pulling only what changed
+    since the last sync, so traffic scales with the rate of change rather than
+    with project size. The snapshot is the local index the UI reads from.
+    """
+    def __init__(self, api_client: APIClient, snapshot: SnapshotStore):
+        self.api_client = api_client
+        self.snapshot = snapshot
+        self._tasks_synced_at: Dict[str, float] = {} # Monotonic time of each project's last successful task sync
+
+    def local_projects(self, user_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """The user's projects from the local index, in assignment order, or None if nothing is stored."""
+        stored = self.snapshot.get_projects()
+        if stored is None:
+            return None
+        known = {project['id']: project for project in stored}
+        return [known[pid] for pid in user_data.get('projects', []) if pid in known]
+
+    def local_tasks(self, project_id: str) -> Optional[List[Dict[str, Any]]]:
+        """A project's task summaries from the local index, or None if nothing is stored."""
+        return self.snapshot.get_tasks(project_id)
+
+    def _pull(self, path: str, collection: str, cursor_key: str, current: Optional[List[Dict[str, Any]]],
+              save: Callable[[List[Dict[str, Any]], Optional[str]], None],
+              params: Optional[Dict[str, str]] = None, record=None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Applies the changes feed at `path` to `current`. Returns None if the backend has no feed.
+        Changed items are converted with `record.from_json`, if given.
+        """
+        # Without a local copy to patch, ask for everything
+        cursor = self.snapshot.get_cursor(cursor_key) if current is not None else None
+        page = self.api_client.get_changes(path, cursor, params)
+        if page is None:
+            return None
+        metrics.inc("sync_pulls_total", {"collection": collection, "mode": "full" if page.get("full") else "delta"})
+        if record is not None and page.get("items"):
+            page["items"] = [record.from_json(item) for item in page["items"]]
+        if not page.get("full") and not page.get("items") and not page.get("deleted"):
+            if page.get("cursor") != cursor:
+                save(current, page.get("cursor"))
+            return current # Nothing changed
+        merged = apply_changes(current or [], page)
+        # Replaying a page is harmless, so overlapping syncs of the same collection need no locking
+        save(merged, page.get("cursor"))
+        return merged
+
+    def sync_tasks(self, project_id: str, max_age: float = 0) -> Optional[List[Dict[str, Any]]]:
+        """
+        Brings a project's task summaries up to date and returns them, or None if they could not be loaded.
+        Tasks synced less than `max_age` seconds ago (e.g. by the prefetcher) are returned without a request.
+        """
+        synced_at = self._tasks_synced_at.get(project_id)
+        if max_age > 0 and synced_at is not None and time.monotonic() - synced_at < max_age:
+            tasks = self.snapshot.get_tasks(project_id)
+            if tasks is not None:
+                metrics.inc("sync_pulls_total", {"collection": "tasks", "mode": "fresh"})
+                return tasks
+        requested_at = time.monotonic()
+        try:
+            tasks = self._pull(
+                TASK_CHANGES_PATH, "tasks", f"tasks:{project_id}", self.snapshot.get_tasks(project_id),
+                lambda tasks, cursor: self.snapshot.save_tasks(project_id, tasks, cursor), {"projectId": project_id}, Task
+            )
+            if tasks is not None:
+                self._tasks_synced_at[project_id] = requested_at
+                return tasks
+        except Exception as e:
+            if self.api_client.changes_supported(TASK_CHANGES_PATH):
+                logger.warning("Task sync for project %s failed: %s", project_id, e)
+                return None
+            # Not known to be a working feed (e.g. a 500 from a route that matched /v1/task/{id}); fetch everything
+            logger.warning("Task changes feed failed for project %s, fetching all tasks: %s", project_id, e)
+
+        metrics.inc("sync_pulls_total", {"collection": "tasks", "mode": "fallback"})
+        tasks = self.api_client.get_tasks_for_project(project_id)
+        if tasks is not None:
+            tasks = [Task.from_json(task) for task in tasks]
+            self.snapshot.save_tasks(project_id, tasks)
+            self._tasks_synced_at[project_id] = requested_at
+        return tasks
+
+    def prefetch_projects(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Pulls the projects feed into the local index before the user's project list is
+        known, e.g. at startup while the token is still being checked. Returns every
+        project the feed lists, or None if the backend has no feed or the pull failed.
+        """
+        try:
+            return self._pull(
+                PROJECT_CHANGES_PATH, "projects", "projects", self.snapshot.get_projects(), self.snapshot.save_projects,
+                record=Project
+            )
+        except Exception as e:
+            logger.warning("Project prefetch failed: %s", e)
+            return None
+
+    def sync_projects(self, user_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Brings the user's projects up to date and returns them in assignment order,
+        or None if they could not be loaded. Projects that fail to load are filled
+        in from the snapshot rather than dropped.
+        """
+        project_ids = user_data.get('projects', [])
+        try:
+            projects = self._pull(
+                PROJECT_CHANGES_PATH, "projects", "projects", self.snapshot.get_projects(), self.snapshot.save_projects,
+                record=Project
+            )
+        except Exception as e:
+            logger.warning("Project sync failed: %s", e)
+            projects = None
+        if projects is not None:
+            known = {project['id'] for project in projects}
+            if all(pid in known for pid in project_ids):
+                return self.local_projects(user_data)
+            # Newly assigned projects the feed hasn't covered; the full path picks them up
+
+        metrics.inc("sync_pulls_total", {"collection": "projects", "mode": "fallback"})
+        result = self.api_client.get_projects_with_errors(user_data)
+        if result is None:
+            return None
+        projects, errors = result
+        projects = [Project.from_json(project) for project in projects]
+        if not errors:
+            self.snapshot.save_projects(projects)
+            return projects
+        cached = {project['id']: project for project in self.snapshot.get_projects() or []}
+        loaded = {project['id']: project for project in projects}
+        return [loaded.get(pid) or cached[pid] for pid in project_ids if pid in loaded or pid in cached]
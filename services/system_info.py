@@ -1,8 +1,21 @@
+import getpass
+import hashlib
+import json
+import logging
 import os
 import platform
+import threading
 import uuid
 import time
 import socket
+from typing import Optional, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How often to check (cheaply) whether the host details may have changed, in seconds
+REFRESH_INTERVAL = 300.0
+# How long the first caller may wait for the slow domain lookup before going without it
+DOMAIN_LOOKUP_TIMEOUT = 2.0
 
 def get_domain():
     if platform.system() == "Windows":
@@ -12,19 +25,133 @@ def get_domain():
         parts = fqdn.split('.')
         return '.'.join(parts[1:]) if len(parts) > 1 else None
 
+def get_user() -> str:
+    """Returns the logged-in user; os.getlogin() fails without a controlling terminal."""
+    try:
+        return os.getlogin()
+    except OSError:
+        return getpass.getuser()
+
+class SystemInfoCache:
+    """
+    Gathers system information once per session and serves it from memory.
+
+    Every `refresh_interval` seconds the host name and user are compared against
+    the cached values (two cheap calls); only when they differ is everything
+    gathered again. The domain lookup (`socket.getfqdn()`, which can block for
+    seconds on a bad DNS setup) always runs on a background thread; callers
+    wait for it at most `lookup_timeout` seconds after each gather. Once the
+    details have been handed out without a domain, a late lookup result is
+    dropped, so every window of the session carries the same host details.
+    """
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL, lookup_timeout: float = DOMAIN_LOOKUP_TIMEOUT):
+        self.refresh_interval = refresh_interval
+        self.lookup_timeout = lookup_timeout
+        self._lock = threading.Lock()
+        self._info: Optional[Dict[str, Optional[str]]] = None
+        self._identity: Optional[Tuple[str, str]] = None
+        self._checked_at = 0.0
+        self._domain_ready = threading.Event()
+        self._domain_deadline = 0.0 # Monotonic time after which callers stop waiting for the lookup
+        self._served_without_domain = False
+        self._generation = 0 # Counts gathers, so a lookup started by an earlier one is ignored
+        self._fingerprints: Dict[str, Dict[str, Optional[str]]] = {}
+
+    def warm_up(self):
+        """Starts gathering in the background so the first window doesn't wait for it."""
+        with self._lock:
+            if self._info is None:
+                self._gather()
+
+    def get(self) -> Dict[str, Optional[str]]:
+        """Returns the cached system information, refreshing it if the host has changed."""
+        with self._lock:
+            now = time.monotonic()
+            if self._info is None:
+                self._gather()
+            elif now - self._checked_at >= self.refresh_interval:
+                self._checked_at = now
+                if (socket.gethostname(), get_user()) != self._identity:
+                    self._gather()
+        # Only callers right after a (re)gather wait here, together no longer than the timeout
+        remaining = self._domain_deadline - time.monotonic()
+        if remaining > 0:
+            self._domain_ready.wait(remaining)
+        with self._lock:
+            if not self._domain_ready.is_set():
+                self._served_without_domain = True
+            return dict(self._info)
+
+    def _gather(self):
+        """Re-reads the fast fields and kicks off a background domain lookup. Called with the lock held."""
+        self._identity = (socket.gethostname(), get_user())
+        self._checked_at = time.monotonic()
+        self._info = {
+            "computer": platform.node(),
+            "user": self._identity[1],
+            "domain": self._info.get("domain") if self._info else None,
+            "os": platform.system(),
+            "osVersion": platform.release(),
+            # Use the MAC address to generate a stable hardware ID
+            "hwid": hex(uuid.getnode())
+        }
+        self._domain_ready.clear()
+        self._domain_deadline = self._checked_at + self.lookup_timeout
+        self._served_without_domain = False
+        self._generation += 1
+        threading.Thread(target=self._lookup_domain, args=(self._generation,), name="domain-lookup", daemon=True).start()
+
+    def _lookup_domain(self, generation: int):
+        try:
+            domain = get_domain()
+        except Exception as e:
+            logger.warning("Domain lookup failed: %s", e)
+            domain = None
+        with self._lock:
+            if generation != self._generation:
+                return
+            if self._served_without_domain:
+                logger.info("Domain lookup finished after the host details were sent without it; keeping them.")
+            else:
+                self._info["domain"] = domain
+            self._domain_ready.set()
+
+    def fingerprint(self) -> Tuple[str, Dict[str, Optional[str]]]:
+        """
+        Returns a short, stable reference for the current host details together with the details.
+        Windows can carry the reference instead of the full host fields once it is registered.
+        """
+        info = self.get()
+        ref = hashlib.sha256(json.dumps(info, sort_keys=True).encode()).hexdigest()[:16]
+        with self._lock:
+            self._fingerprints[ref] = info
+        return ref, info
+
+    def lookup_fingerprint(self, ref: str) -> Optional[Dict[str, Optional[str]]]:
+        """Returns the host details behind a reference handed out this session."""
+        with self._lock:
+            return self._fingerprints.get(ref)
+
+_cache = SystemInfoCache()
+
 def get_system_info() -> dict:
     """
     Gathers various pieces of system and hardware information.
+    Served from a per-session cache; see SystemInfoCache.
     """
-    return {
-        "computer": platform.node(),
-        "user": os.getlogin(),
-        "domain": get_domain(), # This is harder to get reliably, placeholder for now
-        "os": platform.system(),
-        "osVersion": platform.release(),
-        # Use the MAC address to generate a stable hardware ID
-        "hwid": hex(uuid.getnode()) 
-    }
+    return _cache.get()
+
+def get_host_fingerprint() -> Tuple[str, dict]:
+    """Returns (reference, system info) for the current host."""
+    return _cache.fingerprint()
+
+def lookup_host_fingerprint(ref: str) -> Optional[dict]:
+    """Returns the system info registered under a reference from get_host_fingerprint."""
+    return _cache.lookup_fingerprint(ref)
+
+def warm_up_system_info():
+    """Starts gathering system information in the background."""
+    _cache.warm_up()
 
 def get_timezone_offset() -> int:
     """
@@ -32,4 +159,4 @@ def get_timezone_offset() -> int:
     """
     # time.timezone gives the offset in seconds for non-DST.
     # We negate it because the API likely expects a positive value for zones west of UTC.
-    return -time.timezone * 1000
\ No newline at end of file
+    return -time.timezone * 1000
@@ -0,0 +1,80 @@
+import bisect
+from typing import Any, Dict, List, Optional, Tuple
+from .records import Task
+
+class TaskIndex:
+    """
+    A search index over one project's tasks, built once when the tasks load.
+
+    Tasks are split into the ones assigned to the user and the rest, keeping
+    the backend's order within each partition. Searching is case-insensitive:
+    tasks whose name starts with the query come first (found by binary search
+    over the sorted names), followed by the ones that merely contain it.
+    When a query extends the previous one, as it does while the user types,
+    only the previous matches are scanned again.
+    """
+    def __init__(self, tasks: List[Dict[str, Any]], user_id: Optional[str]):
+        self.tasks: Dict[str, Task] = {}
+        self.assigned: List[str] = []
+        self.others: List[str] = []
+        self._names: Dict[str, str] = {} # Lower-cased names, by task id
+        for task in tasks:
+            task = Task.from_json(task)
+            task_id = task.id
+            self.tasks[task_id] = task
+            self._names[task_id] = task.get('name', '').lower()
+            (self.assigned if user_id in task.get('employees', []) else self.others).append(task_id)
+        self._assigned_set = set(self.assigned)
+        self._sorted = sorted((name, task_id) for task_id, name in self._names.items())
+        self._last_query = ""
+        self._last_matches: Optional[List[str]] = None
+
+    def is_assigned(self, task_id: str) -> bool:
+        return task_id in self._assigned_set
+
+    def name_of(self, task_id: str) -> str:
+        return self.tasks[task_id].get('name', '')
+
+    def rename(self, task_id: str, name: str):
+        """Updates a task's name, e.g. once its full details have loaded."""
+        old = self._names.get(task_id)
+        if old is None:
+            return
+        self.tasks[task_id] = self.tasks[task_id].renamed(name)
+        del self._sorted[bisect.bisect_left(self._sorted, (old, task_id))]
+        self._names[task_id] = name.lower()
+        bisect.insort(self._sorted, (self._names[task_id], task_id))
+        self._last_matches = None
+
+    def _prefix_matches(self, query: str) -> List[str]:
+        start = bisect.bisect_left(self._sorted, (query,))
+        matches = []
+        for name, task_id in self._sorted[start:]:
+            if not name.startswith(query):
+                break
+            matches.append(task_id)
+        return matches
+
+    def search(self, query: str) -> Tuple[List[str], List[str]]:
+        """
+        Returns the ids of the (assigned, other) tasks matching `query`, prefix
+        matches first. An empty query matches every task in its original order.
+        """
+        query = query.strip().lower()
+        if not query:
+            self._last_query, self._last_matches = "", None
+            return list(self.assigned), list(self.others)
+
+        if self._last_matches is not None and self._last_query and query.startswith(self._last_query):
+            candidates = self._last_matches # Narrowing the previous search
+        else:
+            candidates = self.assigned + self.others
+        prefix = self._prefix_matches(query)
+        prefix_set = set(prefix)
+        contains = [task_id for task_id in candidates if task_id not in prefix_set and query in self._names[task_id]]
+        matches = prefix + contains
+        self._last_query, self._last_matches = query, matches
+
+        assigned = [task_id for task_id in matches if task_id in self._assigned_set]
+        others = [task_id for task_id in matches if task_id not in self._assigned_set]
+        return assigned, others
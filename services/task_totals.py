@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from .api_client import APIClient
+
+class TaskTotalsStore:
+    """
+    The user's total tracked time per task, kept locally so selecting a task
+    never waits for the backend.
+
+    Totals are loaded for all assigned tasks in one batched request and are
+    reconciled with the backend once they are older than `reconcile_interval`
+    seconds. In between, every window tracked on this machine is added as soon
+    as it is produced, so the displayed total grows while tracking. A window
+    stays counted locally until a reconcile that started after its upload, by
+    which time the backend's total includes it.
+    """
+    def __init__(self, api_client: APIClient, owner_id: str, reconcile_interval: float = 300.0):
+        self.api_client = api_client
+        self.owner_id = owner_id
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+        self._server: Dict[str, int] = {} # Backend totals, in ms
+        self._fetched_at: Dict[str, float] = {} # Monotonic time each backend total was requested
+        # Windows tracked here, keyed by (taskId, start): [duration in ms, monotonic upload time or None]
+        self._local: Dict[Tuple[str, int], List] = {}
+
+    def total(self, task_id: str) -> Optional[int]:
+        """The task's total in ms, including windows not yet reconciled, or None if it was never loaded."""
+        with self._lock:
+            if task_id not in self._server:
+                return None
+            return self._server[task_id] + sum(entry[0] for (tid, _), entry in self._local.items() if tid == task_id)
+
+    def stale_ids(self, task_ids: List[str]) -> List[str]:
+        """The tasks whose totals were never loaded or are due for reconciliation."""
+        now = time.monotonic()
+        with self._lock:
+            return [tid for tid in task_ids if now - self._fetched_at.get(tid, -float("inf")) >= self.reconcile_interval]
+
+    def load(self, task_ids: List[str], force: bool = False) -> Dict[str, int]:
+        """
+        Loads (or reconciles) the totals of the given tasks that are stale, in one batched
+        request. Returns the ones fetched. Runs on a pool thread.
+        """
+        task_ids = list(task_ids) if force else self.stale_ids(task_ids)
+        if not task_ids:
+            return {}
+        requested_at = time.monotonic()
+        # A per-task fallback may be answered from the response cache, so only trust
+        # the totals to include uploads from before the oldest answer they could be
+        settled_at = requested_at - self.api_client.cache_ttls.get("task_time", 0)
+        totals = self.api_client.get_task_times(self.owner_id, task_ids)
+        with self._lock:
+            for task_id, total in totals.items():
+                self._server[task_id] = total
+                self._fetched_at[task_id] = requested_at
+            # Windows uploaded before the request went out are part of the new backend totals now
+            for key in [key for key, (_, uploaded_at) in self._local.items()
+                        if key[0] in totals and uploaded_at is not None and uploaded_at < settled_at]:
+                del self._local[key]
+        return totals
+
+    def add_window(self, window_data: dict):
+        """Counts a window tracked on this machine. Must be called before the window is queued for upload."""
+        key = (window_data.get('taskId'), window_data.get('start'))
+        with self._lock:
+            self._local[key] = [window_data.get('end', 0) - window_data.get('start', 0), None]
+
+    def mark_uploaded(self, windows: List[dict]):
+        """Notes that windows reached the backend, so the next reconcile can stop counting them locally."""
+        now = time.monotonic()
+        with self._lock:
+            for window_data in windows:
+                entry = self._local.get((window_data.get('taskId'), window_data.get('start')))
+                if entry is not None:
+                    entry[1] = now
@@ -0,0 +1,265 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from .outbox import Outbox
+from .records import TimeWindow
+from .activity_sampler import ActivitySampler
+from .config_manager import ConfigManager
+from .session_journal import SessionJournal
+from .system_info import get_system_info, get_host_fingerprint, get_timezone_offset
+
+logger = logging.getLogger(__name__)
+
+# Default length of one time window, in seconds
+WINDOW_SECONDS = 60
+# How often the elapsed time is pushed to the UI while the window is visible / hidden
+VISIBLE_REFRESH_SECONDS = 1
+HIDDEN_REFRESH_SECONDS = 15
+# A jump between the wall clock and the monotonic clock (or a wake-up this late) means the machine was asleep
+SUSPEND_THRESHOLD_SECONDS = 5.0
+# How often the session journal records that tracking is still running; bounds the time a crash can lose
+CHECKPOINT_SECONDS = 5
+
+def build_window(project_id: str, task_id: str, start: int, end: int, host_reference: bool = False) -> TimeWindow:
+    """Builds the payload of a time window from `start` to `end` ms, with the host details or a reference to them."""
+    if host_reference:
+        host_ref, _ = get_host_fingerprint()
+        return TimeWindow(start, end, get_timezone_offset(), project_id, task_id, host_ref=host_ref)
+    return TimeWindow(start, end, get_timezone_offset(), project_id, task_id, host=get_system_info())
+
+def recover_interrupted_session(journal: SessionJournal, outbox: Outbox) -> Optional[TimeWindow]:
+    """
+    Queues the window a crashed session never sent: from the start of its last
+    chunk to its last checkpoint. Returns that window, or None if there was
+    nothing to recover. The journal is cleared either way, unless a new session
+    has started writing to it meanwhile.
+
+    Gathering the host details can wait on a slow domain lookup, so the GUI
+    calls this on a worker thread.
+    """
+    session = journal.recover()
+    window_data = None
+    if session and session.get("owner") and session["lastSeen"] > session["chunkStart"]:
+        # Host details are always sent inline, so the window does not depend on a registered fingerprint
+        window_data = build_window(session["projectId"], session["taskId"], session["chunkStart"], session["lastSeen"])
+        outbox.append(session["owner"], window_data)
+        logger.warning("Recovered %sms tracked before the last run ended unexpectedly.", session['lastSeen'] - session['chunkStart'])
+    journal.discard(session)
+    return window_data
+
+class TrackingEngine:
+    """
+    The time tracking logic, independent of Qt.
+
+    Elapsed time is derived from the monotonic clock rather than counted in
+    sleeps, so it does not drift. run() only wakes when the elapsed time needs
+    reporting or a window boundary is reached, windows are cut at exact
+    boundaries, and stop() takes effect immediately. Time the machine spends
+    suspended is detected, reported and excluded from the tracked time.
+
+    Callbacks run on the thread that runs run(). With a `journal`, the session
+    is checkpointed every CHECKPOINT_SECONDS; see recover_interrupted_session.
+    With an `activity` sampler, each window carries an activity summary, and
+    with `auto_pause` tracking pauses while the user is idle.
+    """
+    def __init__(self, project_id: str, task_id: str, host_reference: bool = False,
+                 window_seconds: int = WINDOW_SECONDS,
+                 on_time_updated: Optional[Callable[[int], None]] = None,
+                 on_window_ready: Optional[Callable[[TimeWindow], None]] = None,
+                 on_suspend: Optional[Callable[[int], None]] = None,
+                 journal: Optional[SessionJournal] = None, owner_id: Optional[str] = None,
+                 activity: Optional[ActivitySampler] = None, auto_pause: bool = False,
+                 on_pause_changed: Optional[Callable[[bool], None]] = None):
+        self.project_id = project_id
+        self.task_id = task_id
+        self.window_seconds = max(1, window_seconds)
+        # When set, windows carry a registered host fingerprint reference instead of the host fields
+        self.host_reference = host_reference
+        self.on_time_updated = on_time_updated # Called with the elapsed seconds
+        self.on_window_ready = on_window_ready # Called with each complete time window
+        self.on_suspend = on_suspend # Called with the length of a suspend/resume gap in milliseconds
+        self.journal = journal
+        self.owner_id = owner_id # Whose outbox a recovered window belongs in
+        self.activity = activity
+        self.on_pause_changed = on_pause_changed # Called with True when tracking pauses for idleness, False on resume
+        if activity and auto_pause:
+            activity.on_idle = self.pause
+            activity.on_active = self.resume
+        self.paused = False
+        self.elapsed_seconds = 0
+        self.chunk_start_time = 0
+        self.ui_refresh_seconds = VISIBLE_REFRESH_SECONDS
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._nudged = False
+        self._pause_for: Optional[float] = None # Seconds of idle time to take back when pausing
+        self._resume = False
+
+    @classmethod
+    def from_config(cls, config: ConfigManager, project_id: str, task_id: str, owner_id: Optional[str] = None,
+                    **kwargs) -> "TrackingEngine":
+        """
+        Creates an engine with the settings from the [Tracking] and [Activity] sections
+        of config.ini: window length, host details, a session journal next to the
+        config file and, unless disabled, activity sampling.
+        """
+        settings = {
+            "host_reference": config.get_value("Tracking", "host_info", "inline") == "reference",
+            "window_seconds": config.get_int("Tracking", "window_seconds", WINDOW_SECONDS),
+            "auto_pause": config.get_bool("Activity", "auto_pause", True),
+        }
+        settings.update(kwargs)
+        if "journal" not in settings:
+            # Checkpoints the session so a crash loses no tracked time; recovered at the next launch
+            settings["journal"] = SessionJournal.for_config(
+                config.filename, config.get_int("Tracking", "journal_fsync_seconds", 10)
+            )
+        if "activity" not in settings:
+            settings["activity"] = ActivitySampler.from_config(config)
+        return cls(project_id, task_id, owner_id=owner_id, **settings)
+
+    def run(self):
+        """Tracks until stop() is called, then sends the final partial window."""
+        self.chunk_start_time = int(time.time() * 1000) # Start time in milliseconds
+        chunk_start_mono = time.monotonic()
+        tracked_before_chunk = 0.0 # Seconds tracked in windows that were already sent
+        next_refresh = chunk_start_mono + self.ui_refresh_seconds
+        next_checkpoint = chunk_start_mono + CHECKPOINT_SECONDS if self.journal else float("inf")
+        if self.journal:
+            self.journal.start(self._journal_session(), self.chunk_start_time)
+        if self.activity:
+            self.activity.start()
+
+        while True:
+            boundary = chunk_start_mono + self.window_seconds if not self.paused else float("inf")
+            last_wall, last_mono = time.time(), time.monotonic()
+            expected_wait = max(0.0, min(boundary, next_refresh, next_checkpoint) - last_mono)
+            with self._cond:
+                if not self._stopping and not self._nudged and self._pause_for is None and not self._resume:
+                    self._cond.wait(expected_wait)
+                nudged, self._nudged = self._nudged, False
+                pause_for, self._pause_for = self._pause_for, None
+                resume, self._resume = self._resume, False
+                if self._stopping:
+                    break
+
+            now_wall, now_mono = time.time(), time.monotonic()
+            # Clocks that pause during suspend show it as wall time passing without monotonic time;
+            # clocks that keep running show it as a wake-up far later than requested
+            gap = max((now_wall - last_wall) - (now_mono - last_mono), (now_mono - last_mono) - expected_wait)
+            if not self.paused and gap > SUSPEND_THRESHOLD_SECONDS:
+                # Close the window at the last moment we know the machine was awake
+                awake_until = last_mono
+                if awake_until > chunk_start_mono:
+                    self.package_and_send_window(self._chunk_end_time(chunk_start_mono, awake_until))
+                tracked_before_chunk += awake_until - chunk_start_mono
+                self.chunk_start_time = int(now_wall * 1000)
+                chunk_start_mono = now_mono
+                next_refresh = now_mono
+                if self.journal:
+                    self.journal.new_chunk(self.chunk_start_time)
+                logger.info("Detected a suspend/resume gap of %.0fs; it was not tracked.", gap)
+                if self.on_suspend:
+                    self.on_suspend(int(gap * 1000))
+            elif now_mono >= boundary:
+                # Cut the window exactly on the boundary; the next one starts where this one ends
+                end_time = self._chunk_end_time(chunk_start_mono, boundary)
+                self.package_and_send_window(end_time)
+                tracked_before_chunk += self.window_seconds
+                self.chunk_start_time = end_time
+                chunk_start_mono = boundary
+                # The window is in the outbox before the journal moves on, so a crash in between cannot lose it
+                if self.journal:
+                    self.journal.new_chunk(self.chunk_start_time)
+            if pause_for is not None and not self.paused:
+                # Close the window when the user went idle (not before the current chunk began) and stop counting
+                idle_since = max(chunk_start_mono, now_mono - pause_for)
+                if idle_since > chunk_start_mono:
+                    self.package_and_send_window(self._chunk_end_time(chunk_start_mono, idle_since))
+                tracked_before_chunk += idle_since - chunk_start_mono
+                self.paused = True
+                next_checkpoint = float("inf")
+                next_refresh = now_mono
+                if self.journal:
+                    self.journal.finish() # Nothing to recover while paused
+                logger.info("Tracking paused after %.0fs without input.", pause_for)
+                if self.on_pause_changed:
+                    self.on_pause_changed(True)
+            if resume and self.paused:
+                # Nothing was tracked while paused; start a fresh chunk now
+                self.paused = False
+                self.chunk_start_time = int(now_wall * 1000)
+                chunk_start_mono = now_mono
+                next_refresh = now_mono
+                next_checkpoint = now_mono + CHECKPOINT_SECONDS if self.journal else float("inf")
+                if self.journal:
+                    self.journal.start(self._journal_session(), self.chunk_start_time)
+                logger.info("Tracking resumed.")
+                if self.on_pause_changed:
+                    self.on_pause_changed(False)
+            if nudged:
+                next_refresh = now_mono
+
+            if now_mono >= next_checkpoint:
+                self.journal.checkpoint(self.chunk_start_time, self._chunk_end_time(chunk_start_mono, now_mono))
+                next_checkpoint = now_mono + CHECKPOINT_SECONDS
+
+            self.elapsed_seconds = int(tracked_before_chunk + (0 if self.paused else now_mono - chunk_start_mono))
+            if now_mono >= next_refresh:
+                if self.on_time_updated:
+                    self.on_time_updated(self.elapsed_seconds)
+                next_refresh = now_mono + self.ui_refresh_seconds
+
+        # Send any remaining time before stopping
+        now_mono = time.monotonic()
+        if not self.paused and now_mono > chunk_start_mono:
+            self.package_and_send_window(self._chunk_end_time(chunk_start_mono, now_mono))
+        if self.journal and not self.paused:
+            self.journal.finish()
+        if self.activity:
+            self.activity.stop()
+
+    def _journal_session(self) -> Dict[str, Any]:
+        return {"owner": self.owner_id, "projectId": self.project_id, "taskId": self.task_id}
+
+    def _chunk_end_time(self, chunk_start_mono: float, end_mono: float) -> int:
+        """Converts a monotonic end point of the current chunk to a wall-clock timestamp in milliseconds."""
+        return self.chunk_start_time + int(round((end_mono - chunk_start_mono) * 1000))
+
+    def set_ui_refresh_interval(self, seconds: int):
+        """
+        Changes how often `on_time_updated` is called, e.g. less often while the window
+        is hidden. The new interval takes effect immediately.
+        """
+        with self._cond:
+            self.ui_refresh_seconds = seconds
+            self._nudged = True
+            self._cond.notify()
+
+    def pause(self, idle_seconds: float = 0.0):
+        """Pauses tracking, taking back the last `idle_seconds` (e.g. time without input). Safe from any thread."""
+        with self._cond:
+            self._pause_for = idle_seconds
+            self._cond.notify()
+
+    def resume(self):
+        """Resumes tracking after pause(). Safe from any thread."""
+        with self._cond:
+            self._resume = True
+            self._cond.notify()
+
+    def stop(self):
+        """Makes run() send its final window and return. Does not wait for it."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+
+    def package_and_send_window(self, end_time: int):
+        """Gathers all data and hands the window to `on_window_ready`."""
+        window_data = build_window(self.project_id, self.task_id, self.chunk_start_time, end_time, self.host_reference)
+        if self.activity:
+            window_data.activity = self.activity.summarize(self.chunk_start_time, end_time)
+        if self.on_window_ready:
+            self.on_window_ready(window_data)
+        logger.info("Packaged a time window of %sms", end_time - self.chunk_start_time)
@@ -0,0 +1,150 @@
+import logging
+import random
+import threading
+import time
+import httpx
+from typing import Dict, Optional
+from .config_manager import ConfigManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://127.0.0.1:8000/api"
+
+# Read timeouts, in seconds, for each class of endpoint
+DEFAULT_READ_TIMEOUTS = {
+    "auth": 10.0, # /auth/login, /auth/me
+    "read": 10.0, # project, task and analytics lookups
+    "upload": 30.0, # time windows (single and bulk) and host registration
+}
+
+# Responses worth retrying for idempotent requests
+RETRYABLE_STATUSES = (429, 502, 503, 504)
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+class TransportSettings:
+    """
+    Connection, timeout, retry and circuit breaker settings for the API client.
+    Every value can be overridden from the [Network] section of config.ini.
+    """
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, max_connections: int = 20, max_keepalive: int = 10,
+                 keepalive_expiry: float = 30.0, http2: bool = False, connect_timeout: float = 5.0,
+                 read_timeouts: Optional[Dict[str, float]] = None, max_retries: int = 3,
+                 backoff_base: float = 0.25, backoff_max: float = 8.0,
+                 breaker_threshold: int = 5, breaker_reset: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.connect_timeout = connect_timeout
+        self.read_timeouts = dict(DEFAULT_READ_TIMEOUTS, **(read_timeouts or {}))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+
+    @classmethod
+    def from_config(cls, config: ConfigManager) -> "TransportSettings":
+        return cls(
+            base_url=config.get_value("Network", "base_url", DEFAULT_BASE_URL),
+            max_connections=config.get_int("Network", "max_connections", 20),
+            max_keepalive=config.get_int("Network", "max_keepalive", 10),
+            keepalive_expiry=config.get_float("Network", "keepalive_expiry", 30.0),
+            http2=config.get_bool("Network", "http2", False),
+            connect_timeout=config.get_float("Network", "connect_timeout", 5.0),
+            read_timeouts={
+                endpoint_class: config.get_float("Network", f"read_timeout_{endpoint_class}", timeout)
+                for endpoint_class, timeout in DEFAULT_READ_TIMEOUTS.items()
+            },
+            max_retries=config.get_int("Network", "max_retries", 3),
+            backoff_base=config.get_float("Network", "backoff_base", 0.25),
+            backoff_max=config.get_float("Network", "backoff_max", 8.0),
+            breaker_threshold=config.get_int("Network", "breaker_threshold", 5),
+            breaker_reset=config.get_float("Network", "breaker_reset", 30.0),
+        )
+
+    def timeout_for(self, endpoint_class: str) -> httpx.Timeout:
+        read = self.read_timeouts.get(endpoint_class, self.read_timeouts["read"])
+        return httpx.Timeout(read, connect=self.connect_timeout)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Exponential backoff with full jitter for the given retry attempt (0-based).
+        A numeric Retry-After header from the server takes precedence, capped at `backoff_max`.
+        """
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+def build_http_client(settings: TransportSettings, transport: Optional[httpx.BaseTransport] = None) -> httpx.Client:
+    """
+    Builds the pooled httpx client. `transport` replaces the network layer,
+    e.g. with an httpx.MockTransport in tests.
+    """
+    http2 = settings.http2
+    if http2:
+        try:
+            import h2 # noqa: F401 -- httpx needs it for HTTP/2
+        except ImportError:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1.")
+            http2 = False
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+    return httpx.Client(limits=limits, http2=http2, timeout=settings.timeout_for("read"), transport=transport)
+
+class CircuitBreaker:
+    """
+    Fails requests fast while the backend is down.
+
+    After `threshold` consecutive failures (transport errors or 5xx responses)
+    the circuit opens and requests raise CircuitOpenError without touching the
+    network. Once `reset_timeout` seconds have passed, one probe request is let
+    through (half-open): success closes the circuit, failure re-opens it.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Raises CircuitOpenError if the request must not be sent right now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        raise CircuitOpenError("Backend unavailable (circuit open); request not sent")
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Circuit breaker opened after %s consecutive failures.", self._failures)
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,306 @@
+import logging
+import threading
+import time
+import httpx
+from typing import Callable, Optional
+from .api_client import APIClient
+from .config_manager import ConfigManager
+from .metrics import metrics
+from .outbox import Outbox
+from .system_info import lookup_host_fingerprint
+from .window_codec import available_compressions
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the backend will never accept this window; it is parked as failed
+REJECTED_STATUSES = (400, 422)
+# Statuses that mean the token is no longer accepted; uploads pause until it changes
+AUTH_STATUSES = (401, 403)
+
+class Uploader:
+    """
+    Drains the time window outbox to the backend, independent of Qt.
+
+    Windows are uploaded strictly in the order they were tracked. Windows the
+    backend rejects as invalid (400, 422) are parked in the outbox as failed so
+    they never block the queue. A 401 or 403 pauses uploading until the token
+    changes; every other failure is retried with exponential backoff.
+
+    In bulk mode (`bulk_size` > 1) up to `bulk_size` windows are sent per request
+    in the compressed columnar format, once enough have accumulated or the oldest
+    has waited `max_batch_delay` seconds.
+    """
+    def __init__(self, api_client: APIClient, outbox: Outbox, owner_id: str,
+                 tick_seconds: float = 1.0, initial_backoff: float = 1.0, max_backoff: float = 300.0,
+                 bulk_size: int = 0, max_batch_delay: float = 300.0, compression: str = "gzip",
+                 on_stats: Optional[Callable[[dict], None]] = None,
+                 on_sent: Optional[Callable[[list], None]] = None):
+        self.api_client = api_client
+        self.outbox = outbox
+        self.owner_id = owner_id
+        self.bulk_size = bulk_size
+        self.max_batch_delay = max_batch_delay
+        self.compression = compression
+        # After a batch is rejected, windows up to this entry id are sent one by one to isolate the bad one
+        self._single_through = 0
+        # Called with a dict of counters (queue depth, totals and drain rate) when they change, at most once per tick
+        self.on_stats = on_stats
+        # Called on the uploader's thread with the windows the backend just accepted
+        self.on_sent = on_sent
+        self.tick_seconds = tick_seconds
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._is_running = True
+        self._wake = threading.Event()
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._rejected_token: Optional[str] = None # The token the backend last refused; nothing is sent while it is current
+        self.in_flight = False # True while windows are being sent; background prefetching waits for it
+        self.sent_total = 0
+        self.failed_total = 0
+        self.retries_total = 0
+        self._saved_hosts = set() # Host refs persisted to the outbox this session
+        self._registered_hosts = set() # Host refs registered with the backend this session
+        self._unregistrable_hosts = set() # Host refs the backend refused to register; their windows go inline
+
+    def enqueue(self, window_data: dict):
+        """
+        Appends a window to the outbox and wakes the uploader. Safe to call from
+        any thread; it only performs a local database write.
+        """
+        host_ref = window_data.get("hostRef")
+        if host_ref and host_ref not in self._saved_hosts:
+            host_info = lookup_host_fingerprint(host_ref)
+            if host_info is not None:
+                self.outbox.save_host(host_ref, host_info)
+            self._saved_hosts.add(host_ref)
+        self.outbox.append(self.owner_id, window_data)
+        self._wake.set()
+
+    @classmethod
+    def from_config(cls, config: ConfigManager, api_client: APIClient, outbox: Outbox, owner_id: str,
+                    **kwargs) -> "Uploader":
+        """Creates an uploader with the batching settings from the [Upload] section of config.ini."""
+        bulk = config.get_value("Upload", "mode", "single") == "bulk"
+        settings = {
+            "bulk_size": config.get_int("Upload", "batch_size", 50) if bulk else 0,
+            "max_batch_delay": config.get_int("Upload", "max_batch_delay", 300),
+            "compression": config.get_value("Upload", "compression", "gzip"),
+        }
+        settings.update(kwargs)
+        if settings["compression"] not in available_compressions():
+            logger.warning("Compression %r is not available here; bulk uploads use gzip.", settings["compression"])
+            settings["compression"] = "gzip"
+        return cls(api_client, outbox, owner_id, **settings)
+
+    def flush(self):
+        """Sends partially filled batches right away instead of waiting for them to fill, e.g. before exiting."""
+        self.max_batch_delay = 0
+        self._wake.set()
+
+    def run(self):
+        """The drain loop; runs until stop() is called. Sleeps until woken while there is nothing to send."""
+        last_tick = time.monotonic()
+        sent_at_last_tick = 0
+        last_stats = None
+
+        while self._is_running:
+            delay = self._drain_once()
+
+            # Stats at most once per tick while busy, and once more on going idle; only sent when they changed
+            now = time.monotonic()
+            if delay is None or now - last_tick >= self.tick_seconds:
+                stats = self._build_stats(now - last_tick, self.sent_total - sent_at_last_tick)
+                if stats != last_stats and self.on_stats:
+                    self.on_stats(stats)
+                last_stats = stats
+                last_tick = now
+                sent_at_last_tick = self.sent_total
+
+            if delay is None:
+                self._wake.wait()
+                self._wake.clear()
+            elif delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+
+    def _drain_once(self) -> Optional[float]:
+        """
+        Attempts to upload the oldest pending window. Returns how long to wait before the
+        next attempt, or None if there is nothing to do until enqueue() or stop() wakes the loop.
+        """
+        if not self.api_client.token or self.api_client.token == self._rejected_token:
+            return None
+
+        # New windows wake the loop, but must not cut a pending backoff short
+        remaining = self._retry_at - time.monotonic()
+        if remaining > 0:
+            return remaining
+
+        if self.bulk_size > 1 and not self._single_through:
+            return self._drain_batch()
+
+        entries = self.outbox.peek(self.owner_id, limit=1)
+        if not entries:
+            return None
+
+        entry_id, window_data = entries[0]
+        if entry_id >= self._single_through:
+            self._single_through = 0
+        started = time.perf_counter()
+        self.in_flight = True
+        try:
+            self.api_client.submit_time_window(self._resolve_hosts([window_data])[0])
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status in AUTH_STATUSES:
+                return self._pause_for_auth(status)
+            if status in REJECTED_STATUSES:
+                logger.error("Time window %s rejected by backend: %s - %s", entry_id, status, e.response.text)
+                self.outbox.record_failure(entry_id, f"{status}: {e.response.text}", permanent=True)
+                self.failed_total += 1
+                metrics.inc("windows_rejected_total")
+                return 0.0
+            return self._retry_later(entry_id, f"{status}: {e.response.text}")
+        except Exception as e:
+            return self._retry_later(entry_id, str(e))
+        finally:
+            self.in_flight = False
+
+        self.outbox.ack([entry_id])
+        self._record_sent([window_data], started, "single")
+        return 0.0
+
+    def _drain_batch(self) -> Optional[float]:
+        """Uploads the oldest pending windows in a single bulk request."""
+        entries = self.outbox.peek(self.owner_id, limit=self.bulk_size)
+        if not entries:
+            return None
+        if len(entries) < self.bulk_size:
+            age = self.outbox.oldest_age(self.owner_id) or 0.0
+            if age < self.max_batch_delay:
+                return self.max_batch_delay - age # Wait for the batch to fill up
+
+        entry_ids = [entry_id for entry_id, _ in entries]
+        windows = [window_data for _, window_data in entries]
+        started = time.perf_counter()
+        self.in_flight = True
+        try:
+            self.api_client.submit_time_windows_bulk(self._resolve_hosts(windows), self.compression)
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status in AUTH_STATUSES:
+                return self._pause_for_auth(status)
+            if status in (404, 405, 415):
+                logger.warning("Backend does not accept bulk uploads; sending one window per request.")
+                self.bulk_size = 0
+                return 0.0
+            if status in REJECTED_STATUSES or status == 413:
+                logger.warning("Batch of %s windows rejected (%s); resending them one by one.", len(entries), status)
+                self._single_through = entry_ids[-1]
+                return 0.0
+            return self._retry_later(entry_ids[0], f"{status}: {e.response.text}")
+        except Exception as e:
+            return self._retry_later(entry_ids[0], str(e))
+        finally:
+            self.in_flight = False
+
+        self.outbox.ack(entry_ids)
+        self._record_sent(windows, started, "bulk")
+        return 0.0
+
+    def _record_sent(self, windows: list, started: float, mode: str):
+        """Updates counters and latency metrics after the backend accepted windows."""
+        self.sent_total += len(windows)
+        self._backoff = 0.0
+        metrics.observe("window_send_duration_ms", (time.perf_counter() - started) * 1000, {"mode": mode})
+        metrics.inc("windows_sent_total", {"mode": mode}, len(windows))
+        # How long after a window closed it reached the backend, including time spent queued
+        now_ms = time.time() * 1000
+        for window_data in windows:
+            metrics.observe("window_delivery_delay_ms", now_ms - window_data.get("end", now_ms))
+        if self.on_sent:
+            self.on_sent(windows)
+
+    def _resolve_hosts(self, windows: list) -> list:
+        """
+        Registers the host fingerprints the windows refer to, once per session. A
+        window whose fingerprint could not be registered is sent with the host
+        fields inline instead, so a registration failure never holds up the window.
+        """
+        registered = {host_ref: self._register_host(host_ref)
+                      for host_ref in {window_data.get("hostRef") for window_data in windows} if host_ref}
+        resolved = []
+        for window_data in windows:
+            host_ref = window_data.get("hostRef")
+            host_info = None if registered.get(host_ref, True) else self.outbox.get_host(host_ref)
+            if host_info is not None:
+                window_data = {key: value for key, value in window_data.items() if key != "hostRef"}
+                window_data.update(host_info)
+            resolved.append(window_data)
+        return resolved
+
+    def _register_host(self, host_ref: str) -> bool:
+        """
+        Registers a host fingerprint with the backend. Returns False if it is not
+        registered: for the rest of the session if the backend refused it (4xx),
+        otherwise until the next window tries again.
+        """
+        if host_ref in self._registered_hosts:
+            return True
+        if host_ref in self._unregistrable_hosts:
+            return False
+        host_info = self.outbox.get_host(host_ref)
+        if host_info is None:
+            # Nothing stored to register or inline; the window is sent with its reference as is
+            self._registered_hosts.add(host_ref)
+            return True
+        try:
+            self.api_client.register_host(host_ref, host_info)
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            metrics.inc("host_registration_failures_total")
+            if 400 <= status < 500:
+                logger.warning("Backend refused to register host %s (%s); sending host details inline.", host_ref, status)
+                self._unregistrable_hosts.add(host_ref)
+            else:
+                logger.warning("Failed to register host %s (%s); sending host details inline for now.", host_ref, status)
+            return False
+        except Exception as e:
+            metrics.inc("host_registration_failures_total")
+            logger.warning("Failed to register host %s; sending host details inline for now: %s", host_ref, e)
+            return False
+        self._registered_hosts.add(host_ref)
+        return True
+
+    def _pause_for_auth(self, status: int) -> Optional[float]:
+        """Stops sending until the token changes; the windows stay queued."""
+        logger.warning("Backend refused the token (%s); uploads pause until the next login.", status)
+        self._rejected_token = self.api_client.token
+        metrics.inc("window_upload_auth_pauses_total")
+        return None
+
+    def _retry_later(self, entry_id: int, error: str) -> float:
+        """Records a transient failure and grows the backoff delay."""
+        self.outbox.record_failure(entry_id, error)
+        self.retries_total += 1
+        metrics.inc("window_upload_retries_total")
+        self._backoff = min(self.max_backoff, self._backoff * 2 if self._backoff else self.initial_backoff)
+        self._retry_at = time.monotonic() + self._backoff
+        logger.warning("Failed to upload time window %s, retrying in %.1fs: %s", entry_id, self._backoff, error)
+        return self._backoff
+
+    def _build_stats(self, elapsed: float, sent_this_tick: int) -> dict:
+        return {
+            "queue_depth": self.outbox.depth(self.owner_id),
+            "sent_total": self.sent_total,
+            "failed_total": self.failed_total,
+            "retries_total": self.retries_total,
+            "drain_rate": sent_this_tick / elapsed if elapsed > 0 else 0.0,
+            "backoff_seconds": self._backoff,
+        }
+
+    def stop(self):
+        """Makes run() return after the current attempt. Undelivered windows stay in the outbox for the next run."""
+        self._is_running = False
+        self._wake.set()
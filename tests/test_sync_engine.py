@@ -0,0 +1,21 @@
+from services.sync_engine import apply_changes
+
+CURRENT = [{"id": "a", "v": 1}, {"id": "b", "v": 1}, {"id": "c", "v": 1}]
+
+def test_delta_replaces_in_place_appends_and_drops():
+    page = {"full": False, "items": [{"id": "b", "v": 2}, {"id": "d", "v": 1}], "deleted": ["c"]}
+    assert apply_changes(CURRENT, page) == [{"id": "a", "v": 1}, {"id": "b", "v": 2}, {"id": "d", "v": 1}]
+
+def test_full_page_replaces_everything():
+    page = {"full": True, "items": [{"id": "z", "v": 1}]}
+    assert apply_changes(CURRENT, page) == [{"id": "z", "v": 1}]
+
+def test_replaying_a_page_is_harmless():
+    page = {"items": [{"id": "a", "v": 2}], "deleted": ["b", "missing"]}
+    once = apply_changes(CURRENT, page)
+    assert apply_changes(once, page) == once == [{"id": "a", "v": 2}, {"id": "c", "v": 1}]
+
+def test_current_list_is_not_modified():
+    before = [dict(item) for item in CURRENT]
+    apply_changes(CURRENT, {"items": [{"id": "a", "v": 9}], "deleted": ["b"]})
+    assert CURRENT == before
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from services import tracking_engine
+from services.session_journal import SessionJournal
+from services.tracking_engine import TrackingEngine, recover_interrupted_session
+
+class ShiftedClock:
+    """Stands in for the time module in the engine: the wall clock can jump ahead, as after a suspend."""
+    def __init__(self):
+        self.offset = 0.0
+        self.monotonic = time.monotonic
+
+    def time(self):
+        return time.time() + self.offset
+
+@pytest.fixture(autouse=True)
+def fixed_host(monkeypatch):
+    # Windows carry the host details; don't gather (or wait for a domain lookup on) the real ones
+    monkeypatch.setattr(tracking_engine, "get_system_info", lambda: {"computer": "pc-1", "domain": None})
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = ShiftedClock()
+    monkeypatch.setattr(tracking_engine, "time", clock)
+    return clock
+
+def start(engine):
+    windows = []
+    engine.on_window_ready = windows.append
+    thread = threading.Thread(target=engine.run)
+    thread.start()
+    return windows, thread
+
+def stop(engine, thread):
+    engine.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+def test_windows_are_cut_on_exact_boundaries():
+    engine = TrackingEngine("p1", "t1", window_seconds=1)
+    windows, thread = start(engine)
+    time.sleep(2.4)
+    stop(engine, thread)
+
+    assert [w["end"] - w["start"] for w in windows[:2]] == [1000, 1000]
+    assert 200 <= windows[2]["end"] - windows[2]["start"] <= 700 # The partial window cut by stop()
+    assert all(a["end"] == b["start"] for a, b in zip(windows, windows[1:]))
+    assert windows[0]["projectId"] == "p1" and windows[0]["taskId"] == "t1" and windows[0]["computer"] == "pc-1"
+
+def test_suspended_time_is_excluded(clock):
+    suspends = []
+    engine = TrackingEngine("p1", "t1", window_seconds=60, on_suspend=suspends.append)
+    windows, thread = start(engine)
+    time.sleep(1.3) # The engine last woke to refresh the UI after 1s
+    clock.offset = 120.0 # The machine slept for two minutes
+    engine.set_ui_refresh_interval(1) # Wakes the engine, as a real resume would
+    time.sleep(0.3)
+    stop(engine, thread)
+
+    assert len(suspends) == 1 and 119_000 <= suspends[0] <= 121_000
+    before, after = windows
+    assert before["end"] - before["start"] == pytest.approx(1000, abs=50) # Up to the last moment known awake
+    assert after["start"] - before["end"] >= 119_000
+    assert engine.elapsed_seconds < 3
+
+def test_idle_time_is_taken_back_and_not_tracked_while_paused():
+    paused = []
+    engine = TrackingEngine("p1", "t1", window_seconds=60, on_pause_changed=paused.append)
+    windows, thread = start(engine)
+    time.sleep(0.6)
+    engine.pause(idle_seconds=0.4)
+    time.sleep(0.5)
+    engine.resume()
+    time.sleep(0.3)
+    stop(engine, thread)
+
+    assert paused == [True, False]
+    first, second = windows
+    assert 100 <= first["end"] - first["start"] <= 350 # 0.6s tracked, less the 0.4s idle
+    assert second["start"] - first["end"] >= 800 # Idle plus paused time is a gap
+    assert 200 <= second["end"] - second["start"] <= 500
+
+def test_clean_stop_leaves_nothing_to_recover(tmp_path):
+    journal = SessionJournal(str(tmp_path / "session.journal"))
+    engine = TrackingEngine("p1", "t1", window_seconds=60, journal=journal, owner_id="u1")
+    windows, thread = start(engine)
+    time.sleep(0.2)
+    stop(engine, thread)
+
+    assert len(windows) == 1
+    assert SessionJournal(journal.filename).recover() is None
+
+class FakeOutbox:
+    def __init__(self):
+        self.appended = []
+
+    def append(self, owner, window_data):
+        self.appended.append((owner, window_data))
+
+def test_interrupted_session_is_recovered_once(tmp_path):
+    journal = SessionJournal(str(tmp_path / "session.journal"))
+    journal.start({"owner": "u1", "projectId": "p1", "taskId": "t1"}, 1_000)
+    journal.checkpoint(1_000, 6_000)
+    outbox = FakeOutbox()
+
+    window = recover_interrupted_session(SessionJournal(journal.filename), outbox)
+    assert (window["start"], window["end"], window["taskId"]) == (1_000, 6_000, "t1")
+    assert outbox.appended == [("u1", window)]
+    assert recover_interrupted_session(SessionJournal(journal.filename), outbox) is None
@@ -0,0 +1,66 @@
+import httpx
+import pytest
+
+from services.api_client import APIClient
+from services.config_manager import ConfigManager
+from services.transport import CircuitBreaker, CircuitOpenError, TransportSettings
+
+def test_opens_after_threshold_consecutive_failures():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.before_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_request() # The reset timeout has passed: this is the probe
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request() # Only one probe at a time
+
+def test_probe_success_closes_and_failure_reopens():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_open_circuit_stops_requests_reaching_the_network(tmp_path):
+    requests = []
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(503)
+    settings = TransportSettings(base_url="http://backend", max_retries=0, breaker_threshold=2, breaker_reset=60)
+    client = APIClient(settings=settings, transport=httpx.MockTransport(handler),
+                       config=ConfigManager(str(tmp_path / "config.ini")))
+    client.token = "token"
+
+    for _ in range(2):
+        assert client.get_tasks_by_task_id("t1") is None
+    assert client.breaker.state == CircuitBreaker.OPEN
+    assert client.get_tasks_by_task_id("t1") is None
+    assert len(requests) == 2
+
+def test_backoff_honours_retry_after_within_the_cap():
+    settings = TransportSettings(backoff_base=0.5, backoff_max=4.0)
+    assert settings.backoff_delay(0, "2") == 2.0
+    assert settings.backoff_delay(0, "120") == 4.0
+    assert 0 <= settings.backoff_delay(10, "soon") <= 4.0
@@ -0,0 +1,54 @@
+import gzip
+import json
+
+import pytest
+
+from services.records import TimeWindow
+from services.window_codec import CONTENT_TYPE, available_compressions, decode_windows, encode_windows
+
+HOST = {"computer": "pc-1", "user": "alice", "domain": None, "os": "Linux", "osVersion": "6.1", "hwid": "0x1"}
+
+def make_windows(n=5):
+    start = 1_700_000_000_000
+    return [
+        dict(HOST, start=start + i * 60_000, end=start + (i + 1) * 60_000, timezoneOffset=-3_600_000,
+             projectId="p1", taskId=f"t{i % 2}")
+        for i in range(n)
+    ]
+
+@pytest.mark.parametrize("compression", available_compressions())
+def test_round_trip(compression):
+    windows = make_windows()
+    body, headers = encode_windows(windows, compression)
+    assert headers == {"Content-Type": CONTENT_TYPE, "Content-Encoding": compression}
+    assert decode_windows(body, compression) == windows
+
+def test_columns_are_delta_and_dictionary_encoded():
+    document = json.loads(gzip.decompress(encode_windows(make_windows(3))[0]))
+    assert document["count"] == 3
+    assert document["columns"]["start"] == {"type": "delta", "values": [1_700_000_000_000, 60_000, 60_000]}
+    assert document["columns"]["taskId"] == {"type": "dict", "dictionary": ["t0", "t1"], "codes": [0, 1, 0]}
+
+def test_missing_and_nested_fields_round_trip():
+    windows = make_windows(3)
+    windows[1]["activity"] = {"samples": 4, "cpu": {"mean": 12.5}}
+    del windows[2]["domain"]
+    windows[0]["hostRef"] = "abc"
+    assert decode_windows(encode_windows(windows)[0]) == windows
+
+def test_records_encode_like_their_json():
+    window = TimeWindow(1000, 2000, 0, "p1", "t1", host=HOST, activity={"samples": 1})
+    assert decode_windows(encode_windows([window])[0]) == [window.to_json()]
+
+def test_empty_batch():
+    assert decode_windows(encode_windows([])[0]) == []
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(ValueError):
+        encode_windows(make_windows(), "brotli")
+
+def test_decoder_rejects_other_documents():
+    with pytest.raises(ValueError):
+        decode_windows(gzip.compress(json.dumps({"format": "other", "version": 1}).encode()))
+    with pytest.raises(ValueError):
+        decode_windows(b"", "deflate")
@@ -1,14 +1,25 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
 from PySide6.QtCore import Signal
 from services.api_client import APIClient
+from workers.request_executor import RequestExecutor
+
+def login_and_fetch_user(api_client: APIClient, email: str, password: str):
+    """
+    Logs in and fetches the user's details. Runs on a pool thread.
+    Returns (logged_in, user_data).
+    """
+    if not api_client.login(email, password):
+        return False, None
+    return True, api_client.get_current_user()
 
 class LoginWindow(QWidget):
     # A signal that will be emitted when login is successful
     login_successful = Signal(dict) 
 
-    def __init__(self, api_client: APIClient):
+    def __init__(self, api_client: APIClient, executor: RequestExecutor):
         super().__init__()
         self.api_client = api_client
+        self.executor = executor
         self.setWindowTitle("T3 Tracker - Login")
         self.setup_ui()
 
@@ -51,9 +62,17 @@ class LoginWindow(QWidget):
         self.login_button.setEnabled(False)
         self.status_label.setText("Logging in...")
 
-        # Perform the login using our API client
-        if self.api_client.login(email, password):
-            user_data = self.api_client.get_current_user()
+        # Perform the login in the background; the result arrives in on_login_finished
+        self.executor.submit(
+            login_and_fetch_user, self.api_client, email, password,
+            key="login", on_result=self.on_login_finished,
+            on_error=lambda error: self.on_login_finished((False, None))
+        )
+
+    def on_login_finished(self, result):
+        """Handles the outcome of a background login attempt."""
+        logged_in, user_data = result
+        if logged_in:
             if user_data:
                 # If successful, emit the signal with the user data
                 self.login_successful.emit(user_data)
@@ -1,22 +1,102 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QLineEdit
+from PySide6.QtCore import Qt, Signal, QTimer
 from services.api_client import APIClient
-from workers.tracking_worker import TrackingWorker
+from services.outbox import Outbox
+from services.prefetch_scheduler import PrefetchScheduler, PRIORITY_HOVERED
+from services.snapshot_store import SnapshotStore
+from services.sync_engine import SyncEngine
+from services.system_info import warm_up_system_info
+from services.task_totals import TaskTotalsStore
+from services.uploader import Uploader
+from workers.tracking_worker import TrackingWorker, VISIBLE_REFRESH_SECONDS, HIDDEN_REFRESH_SECONDS
+from workers.request_executor import RequestExecutor
+from workers.upload_worker import UploadWorker
+from ui.task_list_model import TaskListModel
+
+def fetch_task_details(api_client: APIClient, task_ids: list, progress):
+    """Streams (task_id, details) pairs to `progress` until done or cancelled. Runs on a pool thread."""
+    for item in api_client.iter_tasks_by_ids(task_ids):
+        if not progress(item):
+            break
+
+def apply_combo_diff(combo: QComboBox, items: list, first_row: int = 0):
+    """
+    Makes the combo's rows from `first_row` onwards match `items`, a list of (id, text) pairs,
+    touching only the rows that changed. Item ids are stored as the rows' userData.
+    """
+    wanted_ids = {item_id for item_id, _ in items}
+    for row in range(combo.count() - 1, first_row - 1, -1):
+        if combo.itemData(row) not in wanted_ids:
+            combo.removeItem(row)
+    for offset, (item_id, text) in enumerate(items):
+        row = first_row + offset
+        existing = combo.findData(item_id)
+        if existing != row:
+            if existing >= 0:
+                combo.removeItem(existing)
+            combo.insertItem(row, text, userData=item_id)
+        elif combo.itemText(row) != text:
+            combo.setItemText(row, text)
 
 class MainWindow(QWidget):
     logout_requested = Signal()
 
-    def __init__(self, api_client: APIClient, user_data: dict):
+    def __init__(self, api_client: APIClient, user_data: dict, outbox: Outbox, executor: RequestExecutor,
+                 snapshot: SnapshotStore):
         super().__init__()
         self.api_client = api_client
         self.user_data = user_data
-        self.my_task_ids = set()
+        self.outbox = outbox
+        self.executor = executor
+        self.snapshot = snapshot
+        # Projects and tasks are read from the local index, which is kept current with delta syncs
+        self.sync = SyncEngine(api_client, snapshot)
+        self.shown_tasks = None # The task summaries currently rendered in the task combo
+        self.task_model = TaskListModel(self)
         self.setWindowTitle("T3 Tracker")
         
         self.is_tracking = False
         self.tracking_worker = None
-        
+        self.tracking_base_ms = None # The tracked task's total when tracking started; the timer counts on from it
+
+        config = self.api_client.config
+        # Totals for the user's tasks, loaded in batches and advanced locally as windows are tracked
+        self.totals = TaskTotalsStore(
+            api_client, self.user_data.get('id'), config.get_int("Totals", "reconcile_seconds", 300)
+        )
+
         self.setup_ui()
+        # Gather host details now, so the first time window doesn't wait for slow lookups
+        warm_up_system_info()
+
+        # Windows are queued durably and uploaded off the GUI thread
+        self.upload_worker = UploadWorker(
+            Uploader.from_config(config, self.api_client, self.outbox, self.user_data.get('id'),
+                                 on_sent=self.totals.mark_uploaded)
+        )
+        self.upload_worker.stats_updated.connect(self.update_upload_status)
+        self.upload_worker.start()
+
+        # Warms the projects the user is likely to open next while nothing else needs the network
+        self.prefetch = None
+        self.recent_projects_limit = config.get_int("Prefetch", "recent_projects", 5)
+        self.tasks_max_age = 0
+        if config.get_bool("Prefetch", "enabled", True):
+            uploader = self.upload_worker.uploader
+            self.prefetch = PrefetchScheduler.from_config(
+                config, self.sync, self.api_client, self.user_data.get('id'), totals=self.totals,
+                is_busy=lambda: uploader.in_flight or self.executor.pending_count() > 0
+            )
+            # A prefetched task list is current enough to show without syncing it again
+            self.tasks_max_age = self.prefetch.fresh_seconds
+            self.prefetch.start()
+
+        # Reconciles the shown project's totals with the backend once they are due
+        self.totals_timer = QTimer(self)
+        self.totals_timer.setInterval(max(1, self.totals.reconcile_interval) * 1000)
+        self.totals_timer.timeout.connect(self.load_task_totals)
+        self.totals_timer.start()
+
         self.load_projects()
 
     def setup_ui(self):
@@ -29,6 +109,7 @@ class MainWindow(QWidget):
         self.project_combo = QComboBox()
         self.project_combo.setPlaceholderText("Loading projects...")
         self.project_combo.currentIndexChanged.connect(self.on_project_selected)
+        self.project_combo.highlighted.connect(self.on_project_highlighted)
 
         # --- Task Layout with Time Display ---
         task_layout = QHBoxLayout()
@@ -38,7 +119,15 @@ class MainWindow(QWidget):
         task_layout.addWidget(self.task_label)
         task_layout.addWidget(self.task_time_label)
 
+        self.task_search = QLineEdit()
+        self.task_search.setPlaceholderText("Search tasks...")
+        self.task_search.setClearButtonEnabled(True)
+        self.task_search.setEnabled(False)
+        self.task_search.textChanged.connect(self.on_task_search_changed)
+
         self.task_combo = QComboBox()
+        self.task_combo.setModel(self.task_model)
+        self.task_combo.view().setUniformItemSizes(True) # Lets the popup lay out only the rows on screen
         self.task_combo.setPlaceholderText("Select a project first")
         self.task_combo.setEnabled(False)
         self.task_combo.currentIndexChanged.connect(self.on_task_selected)
@@ -50,6 +139,9 @@ class MainWindow(QWidget):
         self.start_stop_button.setEnabled(False)
         self.start_stop_button.clicked.connect(self.toggle_tracking)
         
+        self.upload_status_label = QLabel("") # Shows windows still waiting to be uploaded
+        self.upload_status_label.setAlignment(Qt.AlignCenter)
+
         self.logout_button = QPushButton("Logout")
         self.logout_button.clicked.connect(self.handle_logout)
         
@@ -57,29 +149,79 @@ class MainWindow(QWidget):
         main_layout.addWidget(self.project_label)
         main_layout.addWidget(self.project_combo)
         main_layout.addLayout(task_layout) # Add the horizontal layout
+        main_layout.addWidget(self.task_search)
         main_layout.addWidget(self.task_combo)
         main_layout.addWidget(self.timer_label)
         main_layout.addWidget(self.start_stop_button)
+        main_layout.addWidget(self.upload_status_label)
         main_layout.addWidget(self.logout_button)
         
         self.setLayout(main_layout)
-        self.setFixedSize(300, 340)
+        self.setFixedSize(300, 390)
+
+    def apply_user(self, user_data: dict):
+        """Applies freshly fetched user details, e.g. after revalidating a snapshot at startup."""
+        projects_changed = user_data.get('projects') != self.user_data.get('projects')
+        self.user_data = user_data
+        self.welcome_label.setText(f"Welcome, {self.user_data.get('name', 'User')}!")
+        if projects_changed:
+            self.load_projects()
 
     def load_projects(self):
-        projects = self.api_client.get_projects()
-        self.project_combo.clear()
-        self.project_combo.addItem("Select a project...", userData=None)
-        if projects:
-            for project in projects:
-                self.project_combo.addItem(project['name'], userData=project['id'])
-        else:
+        """
+        Renders the projects from the local index immediately (if any), then
+        syncs them in the background and applies the differences.
+        """
+        cached = self.sync.local_projects(self.user_data)
+        if cached is not None:
+            self.on_projects_loaded(cached)
+        self.executor.submit(
+            self.sync.sync_projects, self.user_data,
+            key="projects", on_result=self.on_projects_loaded, on_error=self.on_projects_failed
+        )
+
+    def on_projects_failed(self, error):
+        # Keep showing the snapshot if we have one; only report when there is nothing to show
+        if self.project_combo.count() == 0:
+            self.on_projects_loaded(None)
+
+    def on_projects_loaded(self, projects):
+        """Updates the project combo in place, keeping the current selection where possible."""
+        if projects is None and self.project_combo.count() > 0:
+            return
+        selected_id = self.project_combo.currentData()
+
+        self.project_combo.blockSignals(True)
+        if self.project_combo.count() == 0:
+            self.project_combo.addItem("Select a project...", userData=None)
+        apply_combo_diff(self.project_combo, [(project['id'], project['name']) for project in projects or []], first_row=1)
+        row = self.project_combo.findData(selected_id) if selected_id else -1
+        self.project_combo.setCurrentIndex(row if row >= 0 else 0)
+        self.project_combo.blockSignals(False)
+
+        if not projects:
             self.project_combo.setPlaceholderText("No projects found")
+        elif self.prefetch:
+            shown = {project['id'] for project in projects}
+            self.prefetch.request_recent([pid for pid in self.snapshot.get_recent_projects() if pid in shown])
+        if selected_id and row < 0:
+            # The selected project is gone; reset the task list
+            self.on_project_selected(self.project_combo.currentIndex())
 
     def on_project_selected(self, index: int):
         project_id = self.project_combo.itemData(index)
-        self.task_combo.clear()
+        # Anything still loading belongs to the previous project
+        for key in ("tasks", "task-details", "task-totals"):
+            self.executor.cancel(key)
+        self.task_search.blockSignals(True)
+        self.task_search.clear()
+        self.task_search.blockSignals(False)
+        self.task_model.clear()
+        self.shown_tasks = None
         self.task_time_label.setText("")
+        self.task_search.setEnabled(bool(project_id))
         if project_id:
+            self.snapshot.touch_project(project_id, self.recent_projects_limit)
             self.task_combo.setEnabled(True)
             self.task_combo.setPlaceholderText("Loading tasks...")
             self.load_tasks(project_id)
@@ -88,6 +230,11 @@ class MainWindow(QWidget):
             self.task_combo.setPlaceholderText("Select a project first")
         self.update_start_button_state()
 
+    def on_project_highlighted(self, index: int):
+        """Prefetches the project under the pointer in the open project list, ahead of everything else."""
+        if self.prefetch:
+            self.prefetch.request(self.project_combo.itemData(index), PRIORITY_HOVERED)
+
     def on_task_selected(self, index: int):
         """Called when the task selection changes to update time display and button state."""
         self.update_start_button_state()
@@ -95,71 +242,102 @@ class MainWindow(QWidget):
 
     def load_tasks(self, project_id: str):
         """
-        Fetches all tasks for the project and populates the dropdown.
-        Fetches full details for "My Tasks" and uses summary for "Other Tasks".
+        Renders the project's tasks from the local index immediately (if any),
+        then pulls their changes in the background.
+        """
+        cached = self.sync.local_tasks(project_id)
+        if cached is not None:
+            self.on_tasks_loaded(cached)
+        self.executor.submit(
+            self.sync.sync_tasks, project_id, max_age=self.tasks_max_age,
+            key="tasks", on_result=self.on_tasks_refreshed,
+            on_error=lambda error: self.on_tasks_refreshed(None)
+        )
+
+    def on_tasks_refreshed(self, all_tasks_summary):
+        """Re-renders the task combo only if the refreshed tasks differ from what is shown."""
+        if all_tasks_summary is None:
+            if self.shown_tasks is None:
+                self.on_tasks_loaded(None)
+            return
+        if all_tasks_summary == self.shown_tasks:
+            return
+        selected_id = self.task_combo.currentData()
+        self.on_tasks_loaded(all_tasks_summary)
+        row = self.task_combo.findData(selected_id) if selected_id else -1
+        if row >= 0:
+            self.task_combo.setCurrentIndex(row)
+
+    def on_tasks_loaded(self, all_tasks_summary):
+        """
+        Populates the task model from the project's task summaries, then fetches
+        full details for "My Tasks" while "Other Tasks" keep their summary.
         """
-        all_tasks_summary = self.api_client.get_tasks_for_project(project_id)
-        self.task_combo.clear()
-        self.my_task_ids.clear()
+        self.shown_tasks = all_tasks_summary
+        self.task_model.set_tasks(all_tasks_summary, self.user_data.get('id'))
+        self.select_first_task_row()
 
         if all_tasks_summary:
-            my_tasks_summary = []
-            other_tasks_summary = []
-            my_user_id = self.user_data.get('id')
-
-            for task_summary in all_tasks_summary:
-                if my_user_id in task_summary.get('employees', []):
-                    my_tasks_summary.append(task_summary)
-                    self.my_task_ids.add(task_summary['id'])
-                else:
-                    other_tasks_summary.append(task_summary)
-            
-            # --- CORRECTED LOGIC: Fetch full details for "My Tasks" ---
-            if my_tasks_summary:
-                self.task_combo.addItem("--- My Tasks ---")
-                self.task_combo.model().item(self.task_combo.count() - 1).setEnabled(False)
-                for task_summary in my_tasks_summary:
-                    # Fetch full details for this specific task
-                    task_details = self.api_client.get_tasks_by_task_id(task_summary['id'])
-                    if task_details:
-                        # Use the detailed name from the full response
-                        self.task_combo.addItem(task_details['name'], userData=task_details['id'])
-                    else:
-                        # Fallback to the summary name if the API call fails
-                        self.task_combo.addItem(task_summary['name'], userData=task_summary['id'])
-
-            if my_tasks_summary and other_tasks_summary:
-                self.task_combo.insertSeparator(self.task_combo.count())
-
-            # Use summary data directly for "Other Tasks"
-            if other_tasks_summary:
-                self.task_combo.addItem("--- Other Tasks ---")
-                self.task_combo.model().item(self.task_combo.count() - 1).setEnabled(False)
-                for task_summary in other_tasks_summary:
-                    self.task_combo.addItem(task_summary['name'], userData=task_summary['id'])
+            # Fetch full details for all "My Tasks" in one batch, filling names in as they arrive.
+            # Tasks that fail to load keep their summary name.
+            assigned = self.task_model.assigned_ids()
+            if assigned:
+                self.executor.submit(
+                    fetch_task_details, self.api_client, assigned,
+                    key="task-details", on_progress=self.on_task_details_loaded
+                )
+                self.load_task_totals()
         else:
             self.task_combo.setPlaceholderText("No tasks found")
         
         self.update_start_button_state()
         self.update_task_time_display()
 
+    def select_first_task_row(self):
+        """Shows the first row (a section header) after the task list was rebuilt, like a freshly filled combo."""
+        self.task_combo.blockSignals(True)
+        self.task_combo.setCurrentIndex(0 if self.task_model.rowCount() else -1)
+        self.task_combo.blockSignals(False)
+
+    def on_task_search_changed(self, text: str):
+        """Filters the task list as the user types, keeping the selected task if it still matches."""
+        selected_id = self.task_combo.currentData()
+        self.task_combo.blockSignals(True)
+        self.task_model.set_query(text)
+        row = self.task_combo.findData(selected_id) if selected_id else -1
+        self.task_combo.setCurrentIndex(row if row >= 0 else (0 if self.task_model.rowCount() else -1))
+        self.task_combo.blockSignals(False)
+        if self.task_model.task_count() and not self.task_model.rowCount():
+            self.task_combo.setPlaceholderText("No matching tasks")
+        if self.task_combo.currentData() != selected_id:
+            self.on_task_selected(self.task_combo.currentIndex())
+
+    def on_task_details_loaded(self, item):
+        task_id, task_details = item
+        if task_details and task_details.get('name'):
+            self.task_model.rename(task_id, task_details['name'])
+
+    def load_task_totals(self):
+        """Loads, in one batch, the totals of the shown "My Tasks" that are missing or due for reconciliation."""
+        stale = self.totals.stale_ids(self.task_model.assigned_ids())
+        if stale:
+            self.executor.submit(
+                self.totals.load, stale,
+                key="task-totals", on_result=lambda totals: self.update_task_time_display()
+            )
+
     def update_task_time_display(self):
-        """Fetches and displays the total time for the selected task if it's assigned to the user."""
+        """Displays the locally known total time for the selected task if it's assigned to the user."""
         task_id = self.task_combo.currentData()
-        if task_id and task_id in self.my_task_ids:
-            employee_id = self.user_data.get('id')
-            time_data = self.api_client.get_task_time(employee_id, task_id)
-            if time_data:
-                ms = time_data.get('totalTimeMillis', 0)
-                self.task_time_label.setText(f"Total: {ms} ms")
-            else:
-                self.task_time_label.setText("Total: 0 ms")
-        else:
+        if not self.task_model.is_assigned(task_id):
             self.task_time_label.setText("")
+            return
+        total = self.totals.total(task_id)
+        self.task_time_label.setText(f"Total: {total or 0} ms") # Assigned tasks with no time data yet show 0
 
     def update_start_button_state(self):
         selected_task_id = self.task_combo.currentData()
-        if selected_task_id and selected_task_id in self.my_task_ids:
+        if self.task_model.is_assigned(selected_task_id):
             self.start_stop_button.setEnabled(True)
         else:
             self.start_stop_button.setEnabled(False)
@@ -170,30 +348,83 @@ class MainWindow(QWidget):
             self.is_tracking = False
             self.start_stop_button.setText("Start Tracking")
             self.project_combo.setEnabled(True)
+            self.task_search.setEnabled(True)
             self.task_combo.setEnabled(True)
+            self.tracking_base_ms = None
             self.update_timer_display(0)
+            self.update_task_time_display()
         else:
             project_id = self.project_combo.currentData()
             task_id = self.task_combo.currentData()
             self.is_tracking = True
             self.start_stop_button.setText("Stop Tracking")
             self.project_combo.setEnabled(False)
+            self.task_search.setEnabled(False)
             self.task_combo.setEnabled(False)
-            self.tracking_worker = TrackingWorker(project_id, task_id)
+            self.tracking_base_ms = self.totals.total(task_id) or 0 # Count on from 0 if the total never loaded
+            self.tracking_worker = TrackingWorker(
+                project_id, task_id, config=self.api_client.config, owner_id=self.user_data.get('id')
+            )
+            self.tracking_worker.paused_changed.connect(self.on_tracking_paused)
             self.tracking_worker.time_updated.connect(self.update_timer_display)
-            self.tracking_worker.window_ready_to_send.connect(self.api_client.send_time_window)
+            if not self.isVisible():
+                self.tracking_worker.set_ui_refresh_interval(HIDDEN_REFRESH_SECONDS)
+            # Direct connections: the window is counted in the totals before it is queued (and possibly
+            # uploaded), and the outbox append runs on the emitting thread, never waiting on the event loop
+            self.tracking_worker.window_ready_to_send.connect(self.totals.add_window, Qt.DirectConnection)
+            self.tracking_worker.window_ready_to_send.connect(self.upload_worker.enqueue, Qt.DirectConnection)
+            self.tracking_worker.window_ready_to_send.connect(self.on_window_tracked)
             self.tracking_worker.start()
 
+    def on_window_tracked(self, window_data: dict):
+        self.update_task_time_display()
+
+    def on_tracking_paused(self, paused: bool):
+        if self.is_tracking:
+            self.start_stop_button.setText("Stop Tracking (paused: idle)" if paused else "Stop Tracking")
+
     def update_timer_display(self, seconds: int):
         h, m, s = seconds // 3600, (seconds % 3600) // 60, seconds % 60
         self.timer_label.setText(f"{h:02d}:{m:02d}:{s:02d}")
+        if self.is_tracking and self.tracking_base_ms is not None:
+            # The tracked task's total counts on with the timer, between windows
+            self.task_time_label.setText(f"Total: {self.tracking_base_ms + seconds * 1000} ms")
+
+    def update_upload_status(self, stats: dict):
+        pending = stats.get('queue_depth', 0)
+        self.upload_status_label.setText(f"{pending} window(s) waiting to upload" if pending else "")
+
+    def showEvent(self, event):
+        # Back on screen: refresh the timer every second again
+        if self.is_tracking and self.tracking_worker:
+            self.tracking_worker.set_ui_refresh_interval(VISIBLE_REFRESH_SECONDS)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # Hidden or minimized: nobody is watching the timer, so wake up far less often
+        if self.is_tracking and self.tracking_worker:
+            self.tracking_worker.set_ui_refresh_interval(HIDDEN_REFRESH_SECONDS)
+        super().hideEvent(event)
+
+    def cancel_requests(self):
+        """Drops any pending results so they are never delivered to a closed window."""
+        for key in ("projects", "tasks", "task-details", "task-totals"):
+            self.executor.cancel(key)
 
     def handle_logout(self):
+        self.cancel_requests()
+        self.totals_timer.stop()
+        if self.prefetch: self.prefetch.stop()
         if self.is_tracking: self.tracking_worker.stop()
+        self.upload_worker.stop()
         self.api_client.logout()
         self.logout_requested.emit()
         self.close()
 
     def closeEvent(self, event):
+        self.cancel_requests()
+        self.totals_timer.stop()
+        if self.prefetch: self.prefetch.stop()
         if self.is_tracking and self.tracking_worker: self.tracking_worker.stop()
+        if self.upload_worker.isRunning(): self.upload_worker.stop()
         event.accept()
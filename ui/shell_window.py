@@ -0,0 +1,36 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PySide6.QtCore import Qt, Signal
+
+class ShellWindow(QWidget):
+    """
+    The first window on screen: the tracker's frame with a loading message.
+
+    It depends on nothing but Qt, so it can be painted before the API client,
+    the rest of the UI or any network call has been loaded. The real window
+    replaces it in the same place once it is ready.
+    """
+    first_painted = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self._painted = False
+        self.setWindowTitle("T3 Tracker")
+        layout = QVBoxLayout()
+        layout.setAlignment(Qt.AlignCenter)
+        self.status_label = QLabel("Loading...")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+        self.setFixedSize(300, 390) # Same size as the main window, so the swap doesn't jump
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            self.first_painted.emit()
+
+    def replace_with(self, window: QWidget):
+        """Shows `window` where the shell is and closes the shell."""
+        window.move(self.pos())
+        window.show()
+        self.close()
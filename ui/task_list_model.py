@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+from services.task_index import TaskIndex
+
+MY_TASKS_HEADER = "--- My Tasks ---"
+OTHER_TASKS_HEADER = "--- Other Tasks ---"
+
+class TaskListModel(QAbstractListModel):
+    """
+    The rows of the task picker: a "My Tasks" section, then "Other Tasks",
+    each under a disabled header row. Task ids are exposed as Qt.UserRole, so
+    a QComboBox using this model works with currentData()/findData().
+
+    Rows are plain task ids looked up in a TaskIndex, and every change to the
+    list is a single model reset, so populating or filtering 10k+ tasks costs
+    one pass instead of one insert per item. Only visible rows are ever drawn.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.task_index: Optional[TaskIndex] = None
+        self.query = ""
+        self._rows: List[Optional[str]] = [] # Task ids; None for a section header
+        self._headers: Dict[int, str] = {}
+        self._row_of: Dict[str, int] = {}
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        task_id = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return self._headers[index.row()] if task_id is None else self.task_index.name_of(task_id)
+        if role == Qt.UserRole:
+            return task_id
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        if index.isValid() and self._rows[index.row()] is None:
+            return Qt.NoItemFlags # Headers cannot be selected
+        return super().flags(index)
+
+    def set_tasks(self, tasks: Optional[List[Dict[str, Any]]], user_id: Optional[str]):
+        """Replaces the tasks, keeping the current search query."""
+        self.task_index = TaskIndex(tasks, user_id) if tasks else None
+        self._rebuild()
+
+    def clear(self):
+        self.query = ""
+        self.set_tasks(None, None)
+
+    def set_query(self, query: str):
+        """Filters the rows to the tasks matching `query`."""
+        self.query = query
+        self._rebuild()
+
+    def is_assigned(self, task_id: Optional[str]) -> bool:
+        return bool(task_id) and self.task_index is not None and self.task_index.is_assigned(task_id)
+
+    def assigned_ids(self) -> List[str]:
+        return list(self.task_index.assigned) if self.task_index else []
+
+    def task_count(self) -> int:
+        return len(self.task_index.tasks) if self.task_index else 0
+
+    def rename(self, task_id: str, name: str):
+        """
+        Updates a task's name in place. The row stays where it is, even if the
+        new name no longer matches the search; the next keystroke re-filters.
+        """
+        if self.task_index is None:
+            return
+        self.task_index.rename(task_id, name)
+        row = self._row_of.get(task_id)
+        if row is not None:
+            model_index = self.createIndex(row, 0)
+            self.dataChanged.emit(model_index, model_index, [Qt.DisplayRole])
+
+    def _rebuild(self):
+        self.beginResetModel()
+        self._rows, self._headers = [], {}
+        if self.task_index is not None:
+            assigned, others = self.task_index.search(self.query)
+            for header, task_ids in ((MY_TASKS_HEADER, assigned), (OTHER_TASKS_HEADER, others)):
+                if task_ids:
+                    self._headers[len(self._rows)] = header
+                    self._rows.append(None)
+                    self._rows.extend(task_ids)
+        self._row_of = {task_id: row for row, task_id in enumerate(self._rows) if task_id is not None}
+        self.endResetModel()
@@ -0,0 +1,156 @@
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+class RequestHandle(QObject):
+    """
+    Tracks a single request submitted to the RequestExecutor.
+
+    The handle lives on the GUI thread. Results, errors and progress updates are
+    delivered to its callbacks through queued signals, so callbacks always run on
+    the GUI thread and never after the request has been cancelled.
+    """
+    # Internal signals, emitted from the pool thread and delivered on the GUI thread
+    _result_ready = Signal(object)
+    _error_raised = Signal(object)
+    _progress_made = Signal(object)
+    _done = Signal()
+
+    finished = Signal() # Emitted once the request has completed, failed or been cancelled
+
+    def __init__(self, key: Optional[str], on_result: Optional[Callable], on_error: Optional[Callable],
+                 on_progress: Optional[Callable]):
+        super().__init__()
+        self.key = key
+        self.submitted_at = time.perf_counter()
+        self._on_result = on_result
+        self._on_error = on_error
+        self._on_progress = on_progress
+        self._cancelled = False
+        self._result_ready.connect(self._deliver_result)
+        self._error_raised.connect(self._deliver_error)
+        self._progress_made.connect(self._deliver_progress)
+        self._done.connect(self.finished)
+
+    def cancel(self):
+        """Cancels the request. Any result that arrives afterwards is discarded."""
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def report_progress(self, item: Any) -> bool:
+        """
+        Called by the running function (on the pool thread) to stream partial results.
+        Returns False once the request is cancelled, so long-running loops can stop early.
+        """
+        if self._cancelled:
+            return False
+        self._progress_made.emit(item)
+        return True
+
+    def _deliver_result(self, result: Any):
+        if not self._cancelled and self._on_result:
+            self._on_result(result)
+
+    def _deliver_error(self, error: Exception):
+        if not self._cancelled and self._on_error:
+            self._on_error(error)
+
+    def _deliver_progress(self, item: Any):
+        if not self._cancelled and self._on_progress:
+            self._on_progress(item)
+
+class _RequestRunnable(QRunnable):
+    """Runs a submitted function on a pool thread and reports back through its handle."""
+    def __init__(self, handle: RequestHandle, fn: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        self.handle = handle
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            # Superseded before it even started; skip the network call entirely
+            if self.handle.is_cancelled():
+                return
+            try:
+                result = self.fn(*self.args, **self.kwargs)
+            except Exception as e:
+                logger.warning("Request %s failed: %s", self.handle.key or self.fn.__name__, e)
+                self.handle._error_raised.emit(e)
+            else:
+                self.handle._result_ready.emit(result)
+        finally:
+            self.handle._done.emit()
+
+class RequestExecutor(QObject):
+    """
+    Runs blocking API calls on a thread pool so the Qt event loop never waits on the network.
+
+    Requests may be given a `key`; submitting a new request with the same key cancels
+    the previous one (e.g. loading tasks for a project the user has already switched away from).
+    """
+    def __init__(self, max_threads: int = 4):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._active: Dict[str, RequestHandle] = {}
+        self._handles = set() # Keeps in-flight handles alive until they finish
+        # Optional observer, called on the GUI thread with each handle once it has finished (e.g. the startup profile)
+        self.on_finished: Optional[Callable[[RequestHandle], None]] = None
+
+    def submit(self, fn: Callable, *args, key: Optional[str] = None, on_result: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, on_progress: Optional[Callable] = None, **kwargs) -> RequestHandle:
+        """
+        Schedules `fn(*args, **kwargs)` on the pool. `on_result` (with the return value) and
+        `on_error` (with the raised exception) are called on the GUI thread.
+        If `on_progress` is given, `fn` receives a `progress` keyword argument: a callable that streams
+        partial results to `on_progress` and returns False once the request is cancelled.
+        """
+        if key is not None:
+            self.cancel(key)
+
+        handle = RequestHandle(key, on_result, on_error, on_progress)
+        if on_progress is not None:
+            kwargs["progress"] = handle.report_progress
+        if key is not None:
+            self._active[key] = handle
+        self._handles.add(handle)
+        handle.finished.connect(lambda: self._forget(handle))
+
+        self.pool.start(_RequestRunnable(handle, fn, args, kwargs))
+        return handle
+
+    def pending_count(self) -> int:
+        """Returns how many submitted requests have not finished yet."""
+        return len(self._handles)
+
+    def cancel(self, key: str):
+        """Cancels the active request with the given key, if any."""
+        handle = self._active.pop(key, None)
+        if handle:
+            handle.cancel()
+
+    def cancel_all(self):
+        """Cancels every request that has not finished yet."""
+        for handle in list(self._handles):
+            handle.cancel()
+        self._active.clear()
+
+    def shutdown(self, timeout_ms: int = 5000):
+        """Cancels outstanding requests and waits for running ones to return."""
+        self.cancel_all()
+        self.pool.clear()
+        self.pool.waitForDone(timeout_ms)
+
+    def _forget(self, handle: RequestHandle):
+        self._handles.discard(handle)
+        if handle.key is not None and self._active.get(handle.key) is handle:
+            del self._active[handle.key]
+        if self.on_finished:
+            self.on_finished(handle)
@@ -0,0 +1,25 @@
+import logging
+from PySide6.QtCore import QThread
+
+logger = logging.getLogger(__name__)
+
+# Workers told to stop that were still busy; kept alive until their thread finishes
+_stopping = set()
+
+def stop_without_blocking(worker: QThread, timeout_ms: int) -> bool:
+    """
+    Waits at most `timeout_ms` for a worker that was told to stop, then lets it finish
+    on its own. Returns True if it had already finished.
+    """
+    if worker.wait(timeout_ms):
+        return True
+    _stopping.add(worker)
+    worker.finished.connect(lambda: _stopping.discard(worker))
+    if worker.isFinished(): # Finished before the connection was made
+        _stopping.discard(worker)
+    return False
+
+def wait_for_stopped_workers(timeout_ms: int = 5000):
+    """Gives stopped workers time to finish their last window or upload, e.g. at exit once no window is left to freeze."""
+    for worker in list(_stopping):
+        worker.wait(timeout_ms)
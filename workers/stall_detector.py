@@ -0,0 +1,108 @@
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional, List
+from PySide6.QtCore import QObject, Signal
+from services.metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+# Frames from files under this directory count as "our" code when picking a stall's call site
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class StallDetector(QObject):
+    """
+    Detects GUI-thread stalls: moments where the Qt event loop is blocked for
+    longer than `threshold_ms`.
+
+    A watchdog thread posts a ping to the event loop every `interval_ms` and
+    waits for it to be answered. If the answer takes longer than the threshold,
+    the GUI thread's stack is captured while it is still blocked, and the stall
+    is recorded in the metrics registry with its call site. Between pings both
+    threads sleep, so the detector costs a couple of wake-ups per interval.
+    """
+    _ping = Signal() # Emitted from the watchdog thread, handled on the GUI thread
+
+    def __init__(self, threshold_ms: int = 200, interval_ms: int = 500, registry: MetricsRegistry = metrics):
+        super().__init__()
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.registry = registry
+        self._gui_thread_id = threading.get_ident() # Must be created on the GUI thread
+        self._cond = threading.Condition()
+        self._pong_at = 0.0
+        self._stopping = False
+        self._active = threading.Event()
+        self._active.set()
+        self._ping.connect(self._on_ping)
+        self._thread = threading.Thread(target=self._watch, name="stall-detector", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def set_active(self, active: bool):
+        """Pauses pinging (e.g. while the application is in the background) or resumes it."""
+        if active:
+            self._active.set()
+        else:
+            self._active.clear()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._active.set()
+        self._thread.join(timeout=1.0)
+
+    def _on_ping(self):
+        with self._cond:
+            self._pong_at = time.monotonic()
+            self._cond.notify()
+
+    def _watch(self):
+        while True:
+            self._active.wait()
+            sent_at = time.monotonic()
+            self._ping.emit()
+            site = None
+            with self._cond:
+                # First wait up to the threshold; if the loop still hasn't answered, it is stalled
+                self._cond.wait_for(lambda: self._stopping or self._pong_at >= sent_at, self.threshold)
+                if self._stopping:
+                    return
+                if self._pong_at < sent_at:
+                    site = self._capture_gui_stack()
+                    self._cond.wait_for(lambda: self._stopping or self._pong_at >= sent_at)
+                    if self._stopping:
+                        return
+                stall_ms = (self._pong_at - sent_at) * 1000
+            if site is not None:
+                self._record(stall_ms, site)
+            with self._cond:
+                if self._cond.wait_for(lambda: self._stopping, self.interval):
+                    return
+
+    def _capture_gui_stack(self) -> List[str]:
+        """Returns the GUI thread's current stack, innermost frame last."""
+        frame = sys._current_frames().get(self._gui_thread_id)
+        if frame is None:
+            return []
+        return [f"{summary.filename}:{summary.lineno} in {summary.name}" for summary in traceback.extract_stack(frame)]
+
+    @staticmethod
+    def _call_site(stack: List[str]) -> Optional[str]:
+        """The innermost frame in the application's own code, or the innermost frame overall."""
+        for line in reversed(stack):
+            if line.startswith(PROJECT_ROOT) and "stall_detector" not in line:
+                return os.path.relpath(line, PROJECT_ROOT)
+        return stack[-1] if stack else None
+
+    def _record(self, stall_ms: float, stack: List[str]):
+        site = self._call_site(stack) or "unknown"
+        self.registry.observe("gui_stall_duration_ms", stall_ms)
+        self.registry.inc("gui_stalls_total", {"site": site})
+        self.registry.record_event("gui_stall", {"duration_ms": round(stall_ms, 1), "site": site, "stack": stack[-15:]})
+        logger.warning("GUI thread blocked for %.0fms at %s", stall_ms, site)
@@ -1,63 +1,62 @@
-import time
+import logging
+from typing import Optional
 from PySide6.QtCore import QThread, Signal
-from services.system_info import get_system_info, get_timezone_offset
+from services.config_manager import ConfigManager
+from services.tracking_engine import TrackingEngine, VISIBLE_REFRESH_SECONDS, HIDDEN_REFRESH_SECONDS
+from workers.shutdown import stop_without_blocking
+
+logger = logging.getLogger(__name__)
 
 class TrackingWorker(QThread):
     """
-    A background thread that handles the time tracking logic.
+    A background thread that runs the time tracking engine and reports
+    through Qt signals. The tracking logic itself lives in
+    services/tracking_engine.py, so it also runs without Qt.
     """
     # Signals to communicate with the main UI thread
     time_updated = Signal(int) # Emits the elapsed seconds
-    window_ready_to_send = Signal(dict) # Emits the complete time window data
+    window_ready_to_send = Signal(object) # Emits the complete time window (a services.records.TimeWindow)
+    suspend_detected = Signal(int) # Emits the length of a detected suspend/resume gap in milliseconds
+    paused_changed = Signal(bool) # Emits True when tracking pauses because the user is idle, False when it resumes
 
-    def __init__(self, project_id: str, task_id: str):
+    def __init__(self, project_id: str, task_id: str, config: Optional[ConfigManager] = None, **kwargs):
+        """
+        With a `config`, the engine is set up by TrackingEngine.from_config; any other
+        keyword arguments (e.g. `owner_id`, `window_seconds`) go to the engine.
+        """
         super().__init__()
-        self.project_id = project_id
-        self.task_id = task_id
-        self._is_running = False
-        self.elapsed_seconds = 0
-        self.chunk_start_time = 0
+        kwargs.update(
+            on_time_updated=self.time_updated.emit,
+            on_window_ready=self.window_ready_to_send.emit,
+            on_suspend=self.suspend_detected.emit,
+            on_pause_changed=self.paused_changed.emit,
+        )
+        if config is not None:
+            self.engine = TrackingEngine.from_config(config, project_id, task_id, **kwargs)
+        else:
+            self.engine = TrackingEngine(project_id, task_id, **kwargs)
+
+    @property
+    def elapsed_seconds(self) -> int:
+        return self.engine.elapsed_seconds
 
     def run(self):
         """The main loop for the background thread."""
-        self._is_running = True
-        self.chunk_start_time = int(time.time() * 1000) # Start time in milliseconds
-        
-        while self._is_running:
-            time.sleep(1)
-            if not self._is_running:
-                break
-                
-            self.elapsed_seconds += 1
-            self.time_updated.emit(self.elapsed_seconds)
-
-            # Every 1 minute (60 seconds), package and send the time window
-            if self.elapsed_seconds % 60 == 0:
-                self.package_and_send_window()
-                # Start a new chunk
-                self.chunk_start_time = int(time.time() * 1000)
-
-    def stop(self):
-        """Stops the tracking thread."""
-        self._is_running = False
-        # Send any remaining time before stopping
-        if self.elapsed_seconds % 60 != 0:
-            self.package_and_send_window()
-        print("Tracking worker stopped.")
+        self.engine.run()
 
-    def package_and_send_window(self):
-        """Gathers all data and emits the signal to send it."""
-        end_time = int(time.time() * 1000)
-        
-        window_data = {
-            "start": self.chunk_start_time,
-            "end": end_time,
-            "timezoneOffset": get_timezone_offset(),
-            "projectId": self.project_id,
-            "taskId": self.task_id,
-            **get_system_info() # Merge in all the system info
-        }
-        
-        self.window_ready_to_send.emit(window_data)
-        print(f"Packaged a time window of {end_time - self.chunk_start_time}ms")
+    def set_ui_refresh_interval(self, seconds: int):
+        """Changes how often `time_updated` is emitted. The new interval takes effect immediately."""
+        self.engine.set_ui_refresh_interval(seconds)
 
+    def stop(self, timeout_ms: int = 200):
+        """
+        Stops the tracking thread. The final window is cut at once; building and
+        handing it off can take longer (gathering host details, stopping the
+        activity sampler), so this waits at most `timeout_ms` and lets the thread
+        finish on its own.
+        """
+        self.engine.stop()
+        if stop_without_blocking(self, timeout_ms):
+            logger.info("Tracking worker stopped.")
+        else:
+            logger.info("Tracking worker stopping after its final window.")
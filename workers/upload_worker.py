@@ -0,0 +1,39 @@
+import logging
+from PySide6.QtCore import QThread, Signal
+from services.uploader import Uploader
+from workers.shutdown import stop_without_blocking
+
+logger = logging.getLogger(__name__)
+
+class UploadWorker(QThread):
+    """
+    A background thread that drains the time window outbox to the backend.
+    The upload logic lives in services/uploader.py, so it also runs without Qt.
+    """
+    # Emits a dict of counters once per tick: queue depth, totals and drain rate
+    stats_updated = Signal(dict)
+
+    def __init__(self, uploader: Uploader):
+        super().__init__()
+        self.uploader = uploader
+        self.uploader.on_stats = self.stats_updated.emit
+
+    def enqueue(self, window_data: dict):
+        """Appends a window to the outbox and wakes the uploader. Safe to call from any thread."""
+        self.uploader.enqueue(window_data)
+
+    def run(self):
+        """The main drain loop for the background thread."""
+        self.uploader.run()
+
+    def stop(self, timeout_ms: int = 200):
+        """
+        Stops the uploader without blocking the caller on an upload in progress: waits at
+        most `timeout_ms`, then lets the thread finish on its own. Undelivered windows
+        stay in the outbox for the next run.
+        """
+        self.uploader.stop()
+        if stop_without_blocking(self, timeout_ms):
+            logger.info("Upload worker stopped.")
+        else:
+            logger.info("Upload worker stopping after the upload in progress.")